@@ -1,9 +1,40 @@
-import tkinter as tk
-from src.gui.main_window import MainWindow
+import argparse
+import time
 
 def main():
+    parser = argparse.ArgumentParser(description="Warudo Blueprint Copy Tool")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="report import and first paint times, then exit")
+    parser.add_argument("--rpc-port", type=int, help="serve the loaded scenes to automation clients on localhost")
+    parser.add_argument("--rpc-socket", help="serve the loaded scenes on a Unix socket")
+    parser.add_argument("--rpc-token", help="token automation clients must send with auth "
+                                            "(generated for --rpc-port and written to "
+                                            "~/.warudo_bp_copy/rpc-token if not given)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+
+    import tkinter as tk
+    from src.gui.main_window import MainWindow
+    imported = time.perf_counter()
+
     root = tk.Tk()
     app = MainWindow(root)
+    built = time.perf_counter()
+
+    if args.startup_timing:
+        # Process pending events so the window is mapped and drawn once
+        root.update()
+        painted = time.perf_counter()
+        print(f"Imports:      {(imported - start) * 1000:7.1f} ms")
+        print(f"Build window: {(built - imported) * 1000:7.1f} ms")
+        print(f"First paint:  {(painted - built) * 1000:7.1f} ms")
+        print(f"Total:        {(painted - start) * 1000:7.1f} ms")
+        root.destroy()
+        return
+
+    if args.rpc_port or args.rpc_socket:
+        app.start_rpc_server(args.rpc_port, args.rpc_socket, args.rpc_token)
+
     root.mainloop()
 
 if __name__ == "__main__":
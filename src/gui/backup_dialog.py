@@ -0,0 +1,70 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import time
+
+class BackupDialog(tk.Toplevel):
+    def __init__(self, parent, title: str, versions, on_restore, action_label: str = "Restore",
+                 confirm_message: str = "Restore version {version}?\nThe current state is kept in the backup history."):
+        super().__init__(parent)
+        self.versions = list(reversed(versions))  # Newest first
+        self.on_restore = on_restore  # Callback receiving the version number
+        self.action_label = action_label
+        self.confirm_message = confirm_message  # Formatted with the version; no confirmation if empty
+
+        self.title(title)
+        self.geometry("600x400")
+        self.transient(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Create version list
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self.tree = ttk.Treeview(tree_frame, columns=("version", "time", "source", "changes", "size"),
+                                 show="headings", selectmode="browse")
+        self.tree.heading("version", text="Version")
+        self.tree.heading("time", text="Saved")
+        self.tree.heading("source", text="Source")
+        self.tree.heading("changes", text="Changes")
+        self.tree.heading("size", text="Size")
+        self.tree.column("version", width=70)
+        self.tree.column("time", width=160)
+        self.tree.column("source", width=80)
+        self.tree.column("changes", width=160)
+        self.tree.column("size", width=80)
+
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        for entry in self.versions:
+            if entry["type"] == "base":
+                changes = "Full snapshot"
+            else:
+                changes = f"{entry.get('changed', 0)} changed, {entry.get('removed', 0)} removed"
+            saved = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["timestamp"]))
+            self.tree.insert("", "end", iid=str(entry["version"]),
+                             values=(entry["version"], saved, entry.get("source", ""), changes,
+                                     f"{entry['size'] / 1024:.1f} KB"))
+
+        # Create buttons
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(btn_frame, text=self.action_label, command=self.restore_selected).pack(side=tk.RIGHT, padx=5)
+
+    def restore_selected(self):
+        """Restore the selected version"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showinfo("Info", "No version selected", parent=self)
+            return
+
+        version = int(selection[0])
+        if not self.confirm_message or messagebox.askyesno(self.action_label, 
+                                                           self.confirm_message.format(version=version),
+                                                           parent=self):
+            self.on_restore(version)
+            self.destroy()
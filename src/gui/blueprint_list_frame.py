@@ -1,16 +1,43 @@
+import json
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List, Dict, Any, Optional
+from src.utils.sort_index import SortIndex
+
+COLUMN_TITLES = {"#0": "Category", "name": "Name", "id": "ID", "enabled": "Enabled", 
+                 "nodes": "Nodes", "connections": "Connections", "variables": "Variables"}
+
+# Sort key per column; category then name is always used as the tiebreak
+SORT_KEYS = {
+    "#0": None,
+    "name": lambda bp: bp.get("name", ""),
+    "id": lambda bp: bp.get("id", ""),
+    "enabled": lambda bp: bp.get("enabled", True),
+    "nodes": lambda bp: bp.get("node_count", 0),
+    "connections": lambda bp: bp.get("connection_count", 0),
+    "variables": lambda bp: bp.get("variable_count", 0)
+}
 
 class BlueprintListFrame(ttk.Frame):
-    def __init__(self, parent, title: str):
+    def __init__(self, parent, title: str, on_modified=None, on_paste=None):
         super().__init__(parent)
         self.title = title
+        self.on_modified = on_modified  # Called after the scene was changed; saves directly if not set
+        self.on_paste = on_paste  # Imports blueprint JSON from the clipboard into this scene
         self.file_path = ""
         self.blueprint_data = None
         self.current_sort_column = None
         self.sort_reverse = False
-        self.blueprints_data = []  # Store original data for sorting
+        self.blueprints_data = []  # Rows by index; removed rows are None until the rows are renumbered
+        self.sort_index = None
+        self.row_by_id = {}
+        self.folder_rows = {}  # Category path -> row indexes in sort order
+        self.subfolders = {}  # Category path -> child paths
+        self.folder_items = {}  # Category path -> tree item ID of rendered folders
+        self.folder_paths = {}
+        self.expanded_folders = set()  # Folders whose children have been rendered
+        self.context_menu = None  # Built on first right click
         self.setup_ui()
     
     def setup_ui(self):
@@ -27,7 +54,7 @@ class BlueprintListFrame(ttk.Frame):
         self.tree_frame.pack(fill=tk.BOTH, expand=True)
         
         # Create treeview with scrollbar
-        self.tree = ttk.Treeview(self.tree_frame, columns=("name", "id", "enabled", "nodes", "connections"), 
+        self.tree = ttk.Treeview(self.tree_frame, columns=("name", "id", "enabled", "nodes", "connections", "variables"), 
                                 show="tree headings", height=15)
         
         # Configure columns
@@ -37,6 +64,7 @@ class BlueprintListFrame(ttk.Frame):
         self.tree.heading("enabled", text="Enabled")
         self.tree.heading("nodes", text="Nodes")
         self.tree.heading("connections", text="Connections")
+        self.tree.heading("variables", text="Variables")
         
         # Configure column widths
         self.tree.column("#0", width=120, minwidth=100)
@@ -45,6 +73,7 @@ class BlueprintListFrame(ttk.Frame):
         self.tree.column("enabled", width=80, minwidth=60)
         self.tree.column("nodes", width=80, minwidth=60)
         self.tree.column("connections", width=100, minwidth=80)
+        self.tree.column("variables", width=80, minwidth=60)
         
         # Create scrollbar
         scrollbar = ttk.Scrollbar(self.tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
@@ -54,17 +83,10 @@ class BlueprintListFrame(ttk.Frame):
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Create context menu
-        self.context_menu = tk.Menu(self, tearoff=0)
-        self.context_menu.add_command(label="Copy Blueprint JSON", command=self.copy_selected_blueprint)
-        self.context_menu.add_command(label="Copy Blueprint ID", command=self.copy_blueprint_id)
-        self.context_menu.add_command(label="Rename Blueprint", command=self.rename_selected_blueprint)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="View Details", command=self.view_blueprint_details)
-        
         # Bind events
         self.tree.bind("<Button-3>", self.show_context_menu)  # Right click
         self.tree.bind("<Double-1>", self.on_double_click)    # Double click
+        self.tree.bind("<<TreeviewOpen>>", self.on_folder_open)  # Lazy folder loading
         
         # Bind header click events for sorting
         self.tree.heading("#0", command=lambda: self.sort_column("#0", "Category"))
@@ -73,6 +95,7 @@ class BlueprintListFrame(ttk.Frame):
         self.tree.heading("enabled", command=lambda: self.sort_column("enabled", "Enabled"))
         self.tree.heading("nodes", command=lambda: self.sort_column("nodes", "Nodes"))
         self.tree.heading("connections", command=lambda: self.sort_column("connections", "Connections"))
+        self.tree.heading("variables", command=lambda: self.sort_column("variables", "Variables"))
         
         # Create info frame
         self.info_frame = ttk.Frame(self)
@@ -85,13 +108,12 @@ class BlueprintListFrame(ttk.Frame):
     def set_file_path(self, file_path: str):
         """Set the file path and update the label"""
         self.file_path = file_path
-        import os
         filename = os.path.basename(file_path)
         self.file_label.config(text=f"File: {filename}")
     
     def sort_column(self, column_id: str, column_name: str):
         """Sort the tree view by the specified column"""
-        if not self.blueprints_data:
+        if not self.sort_index:
             return
         
         # Toggle sort order if clicking the same column
@@ -102,89 +124,180 @@ class BlueprintListFrame(ttk.Frame):
             self.sort_reverse = False
         
         # Update header text to show sort direction
-        for col in ["#0", "name", "id", "enabled", "nodes", "connections"]:
-            if col == "#0":
-                header_text = "Category"
-            elif col == "name":
-                header_text = "Name"
-            elif col == "id":
-                header_text = "ID"
-            elif col == "enabled":
-                header_text = "Enabled"
-            elif col == "nodes":
-                header_text = "Nodes"
-            elif col == "connections":
-                header_text = "Connections"
-            
+        for col, header_text in COLUMN_TITLES.items():
             if col == column_id:
                 arrow = " ↓" if self.sort_reverse else " ↑"
                 header_text += arrow
             
             self.tree.heading(col, text=header_text)
         
-        # Sort the data
-        if column_id == "#0":
-            # Sort by category
-            self.blueprints_data.sort(key=lambda x: x.get("category", ""), reverse=self.sort_reverse)
-        elif column_id == "name":
-            # Sort by name
-            self.blueprints_data.sort(key=lambda x: x.get("name", ""), reverse=self.sort_reverse)
-        elif column_id == "id":
-            # Sort by ID
-            self.blueprints_data.sort(key=lambda x: x.get("id", ""), reverse=self.sort_reverse)
-        elif column_id == "enabled":
-            # Sort by enabled status
-            self.blueprints_data.sort(key=lambda x: x.get("enabled", True), reverse=self.sort_reverse)
-        elif column_id == "nodes":
-            # Sort by node count
-            self.blueprints_data.sort(key=lambda x: x.get("node_count", 0), reverse=self.sort_reverse)
-        elif column_id == "connections":
-            # Sort by connection count
-            self.blueprints_data.sort(key=lambda x: x.get("connection_count", 0), reverse=self.sort_reverse)
-        
-        # If sorting by category, also sort by name within each category
-        if column_id == "#0":
-            from itertools import groupby
-            grouped_data = []
-            # First sort by category, then by name within each category
-            self.blueprints_data.sort(key=lambda x: (x.get("category", ""), x.get("name", "")), reverse=self.sort_reverse)
-        
-        # Refresh the display
-        self.refresh_tree_display()
+        # Sort orders are precomputed, so only the order of rendered rows changes
+        self.rebuild_folder_index()
+        self.render_expanded_folders()
+    
+    def rebuild_folder_index(self):
+        """Group rows by category path in the current sort order"""
+        column = self.current_sort_column or "#0"
+        folder_rows = {}
+        subfolders = {(): set()}
+        known = set()
+        for index in self.sort_index.order(column, self.sort_reverse):
+            path = self.blueprints_data[index]["category_path"]
+            folder_rows.setdefault(path, []).append(index)
+            
+            # Register the folder chain up to the root
+            while path and path not in known:
+                known.add(path)
+                subfolders.setdefault(path[:-1], set()).add(path)
+                path = path[:-1]
+        
+        folders_reverse = column == "#0" and self.sort_reverse
+        self.folder_rows = folder_rows
+        self.subfolders = {path: sorted(children, reverse=folders_reverse) 
+                           for path, children in subfolders.items()}
     
     def refresh_tree_display(self):
         """Refresh the tree display with current data"""
         # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Add blueprints to tree
-        for bp in self.blueprints_data:
-            bp_id_short = bp["id"][:8] + "..." if len(bp["id"]) > 8 else bp["id"]
-            enabled_text = "Yes" if bp["enabled"] else "No"
-            category = bp.get("category", "Uncategorized")
-            
-            self.tree.insert("", "end", 
-                           text=category,
-                           values=(bp["name"], bp_id_short, enabled_text, bp["node_count"], bp["connection_count"]),
-                           tags=("blueprint",))
+        self.tree.delete(*self.tree.get_children())
+        self.folder_items = {}
+        self.folder_paths = {}
+        self.expanded_folders = set()
+        
+        # Only top-level rows are created; folders are filled when opened
+        self.rebuild_folder_index()
+        self.render_folder(())
+    
+    def render_expanded_folders(self):
+        """Re-render the root and every opened folder"""
+        self.render_folder(())
+        for path in sorted(self.expanded_folders, key=len):
+            if path in self.expanded_folders:
+                self.render_folder(path)
+    
+    def render_folder(self, path: tuple):
+        """Create, remove and order the direct children of a folder"""
+        parent_iid = self.folder_items[path] if path else ""
+        
+        desired = []
+        for subfolder in self.subfolders.get(path, []):
+            item_id = self.folder_items.get(subfolder)
+            if item_id is None:
+                item_id = self.insert_folder_item(parent_iid, subfolder)
+            desired.append(item_id)
+        
+        for index in self.folder_rows.get(path, []):
+            item_id = str(index)
+            if not self.tree.exists(item_id):
+                self.insert_blueprint_item(parent_iid, item_id, self.blueprints_data[index])
+            desired.append(item_id)
+        
+        # Drop rows and folders that no longer belong here (including the lazy-load placeholder)
+        desired_set = set(desired)
+        for item_id in self.tree.get_children(parent_iid):
+            if item_id not in desired_set:
+                self.forget_item(item_id)
+        
+        self.tree.set_children(parent_iid, *desired)
+    
+    def insert_folder_item(self, parent_iid: str, path: tuple) -> str:
+        """Insert a collapsed folder with a placeholder child so it can be opened"""
+        item_id = f"folder{len(self.folder_paths)}"
+        while self.tree.exists(item_id):
+            item_id += "_"
+        
+        self.tree.insert(parent_iid, "end", iid=item_id, text=path[-1], tags=("folder",))
+        self.tree.insert(item_id, "end", iid=f"{item_id}:placeholder", text="")
+        self.folder_items[path] = item_id
+        self.folder_paths[item_id] = path
+        return item_id
+    
+    def insert_blueprint_item(self, parent_iid: str, item_id: str, bp: Dict[str, Any]):
+        """Insert a single blueprint row"""
+        bp_id_short = bp["id"][:8] + "..." if len(bp["id"]) > 8 else bp["id"]
+        enabled_text = "Yes" if bp["enabled"] else "No"
+        category = "" if parent_iid else bp.get("category", "Uncategorized")
+        
+        self.tree.insert(parent_iid, "end", iid=item_id,
+                       text=category,
+                       values=(bp["name"], bp_id_short, enabled_text, bp["node_count"], bp["connection_count"], bp["variable_count"]),
+                       tags=("blueprint",))
+    
+    def forget_item(self, item_id: str):
+        """Delete a tree item and forget any folders inside it"""
+        path = self.folder_paths.pop(item_id, None)
+        if path is not None:
+            for folder_path in [p for p in self.folder_items if p[:len(path)] == path]:
+                self.folder_paths.pop(self.folder_items.pop(folder_path), None)
+                self.expanded_folders.discard(folder_path)
+        self.tree.delete(item_id)
+    
+    def on_folder_open(self, event):
+        """Fill a folder with its children the first time it is opened"""
+        path = self.folder_paths.get(self.tree.focus())
+        if path is not None and path not in self.expanded_folders:
+            self.expanded_folders.add(path)
+            self.render_folder(path)
     
     def load_blueprints(self, blueprint_data):
         """Load blueprints into the tree view"""
         self.blueprint_data = blueprint_data
         
-        # Get blueprint list and store it
-        self.blueprints_data = blueprint_data.get_blueprint_list()
-        
-        # Default sort by category, then by name
-        self.blueprints_data.sort(key=lambda x: (x.get("category", ""), x.get("name", "")))
+        # Get blueprint list and precompute sort orders (category, then name by default)
+        self.sort_index = SortIndex(blueprint_data.get_blueprint_list(), SORT_KEYS)
+        self.blueprints_data = self.sort_index.rows
+        self.row_by_id = {bp["id"]: index for index, bp in enumerate(self.blueprints_data)}
         
         # Refresh the display
         self.refresh_tree_display()
+        self.update_info_label()
+    
+    def sync_blueprints(self):
+        """Update the list after the loaded scene changed, touching only changed rows"""
+        if not self.blueprint_data:
+            return
+        if not self.sort_index:
+            self.load_blueprints(self.blueprint_data)
+            return
         
-        # Update info label
-        scene_info = blueprint_data.get_scene_info()
-        info_text = f"Scene: {scene_info['name']} | Blueprints: {len(self.blueprints_data)} | Version: {scene_info['appVersion']}"
+        current = {bp["id"]: bp for bp in self.blueprint_data.get_blueprint_list()}
+        
+        # Remove rows that disappeared or changed
+        for bp_id, index in list(self.row_by_id.items()):
+            if current.get(bp_id) != self.blueprints_data[index]:
+                self.sort_index.remove(index)
+                del self.row_by_id[bp_id]
+                if self.tree.exists(str(index)):
+                    self.tree.delete(str(index))
+        
+        # Add new and changed rows; they are rendered once their folder is open
+        for bp_id, bp in current.items():
+            if bp_id not in self.row_by_id:
+                self.row_by_id[bp_id] = self.sort_index.add(bp)
+        
+        selected = None
+        if self.sort_index.is_sparse:
+            selected = self.get_selected_blueprints()
+            self.renumber_rows()
+        
+        self.rebuild_folder_index()
+        self.render_expanded_folders()
+        if selected:
+            self.tree.selection_set([str(self.row_by_id[bp_id]) for bp_id in selected
+                                     if bp_id in self.row_by_id and self.tree.exists(str(self.row_by_id[bp_id]))])
+        self.update_info_label()
+    
+    def renumber_rows(self):
+        """Drop removed rows from the sort index; rendered rows are named by index, so they are created again"""
+        for item_id in list(self.tree.tag_has("blueprint")):
+            self.tree.delete(item_id)
+        new_indexes = self.sort_index.compact()
+        self.row_by_id = {bp_id: new_indexes[index] for bp_id, index in self.row_by_id.items()}
+    
+    def update_info_label(self):
+        """Update the scene info label"""
+        scene_info = self.blueprint_data.get_scene_info()
+        info_text = f"Scene: {scene_info['name']} | Blueprints: {len(self.row_by_id)} | Version: {scene_info['appVersion']}"
         self.info_label.config(text=info_text)
     
     def get_selected_blueprints(self) -> List[str]:
@@ -195,24 +308,61 @@ class BlueprintListFrame(ttk.Frame):
         
         selected_bps = []
         for item in selected_items:
-            item_index = self.tree.index(item)
-            if item_index < len(self.blueprints_data):
-                selected_bps.append(self.blueprints_data[item_index]["id"])
+            # Folder rows are not blueprints
+            if not item.isdigit():
+                continue
+            bp = self.blueprints_data[int(item)]
+            if bp:
+                selected_bps.append(bp["id"])
         
         return selected_bps
     
+    def select_blueprints(self, bp_ids: List[str]):
+        """Select blueprint rows, opening the folders they are in"""
+        items = []
+        for bp_id in bp_ids:
+            index = self.row_by_id.get(bp_id)
+            if index is None:
+                continue
+            path = self.blueprints_data[index]["category_path"]
+            for depth in range(1, len(path) + 1):
+                folder = path[:depth]
+                if folder not in self.expanded_folders:
+                    self.expanded_folders.add(folder)
+                    self.render_folder(folder)
+                self.tree.item(self.folder_items[folder], open=True)
+            items.append(str(index))
+        
+        self.tree.selection_set(items)
+        if items:
+            self.tree.see(items[0])
+    
     def clear_selection(self):
         """Clear tree selection"""
         self.tree.selection_remove(self.tree.selection())
     
     def show_context_menu(self, event):
         """Show context menu on right click"""
-        if self.tree.selection():
-            self.context_menu.post(event.x_root, event.y_root)
+        if self.tree.selection() or (self.on_paste and self.blueprint_data):
+            self.get_context_menu().post(event.x_root, event.y_root)
+    
+    def get_context_menu(self) -> tk.Menu:
+        """Get the context menu, creating it on first use"""
+        if self.context_menu is None:
+            self.context_menu = tk.Menu(self, tearoff=0)
+            self.context_menu.add_command(label="Copy Blueprint JSON", command=self.copy_selected_blueprint)
+            self.context_menu.add_command(label="Copy Blueprint ID", command=self.copy_blueprint_id)
+            if self.on_paste:
+                self.context_menu.add_command(label="Paste Blueprints", command=self.on_paste)
+            self.context_menu.add_command(label="Rename Blueprint", command=self.rename_selected_blueprint)
+            self.context_menu.add_separator()
+            self.context_menu.add_command(label="View Details", command=self.view_blueprint_details)
+        return self.context_menu
     
     def on_double_click(self, event):
         """Handle double click on blueprint"""
-        self.view_blueprint_details()
+        if self.get_selected_blueprints():
+            self.view_blueprint_details()
     
     def copy_selected_blueprint(self):
         """Copy selected blueprint to clipboard (as JSON)"""
@@ -225,7 +375,6 @@ class BlueprintListFrame(ttk.Frame):
         bp_data = self.blueprint_data.get_blueprint_by_id(bp_id)
         
         if bp_data:
-            import json
             json_str = json.dumps(bp_data, indent=2, ensure_ascii=False)
             
             # Copy to clipboard
@@ -293,9 +442,12 @@ class BlueprintListFrame(ttk.Frame):
             def on_ok():
                 new_name = name_var.get().strip()
                 if new_name and new_name != bp_data["name"]:
-                    bp_data["name"] = new_name
-                    self.blueprint_data.save()
-                    self.load_blueprints(self.blueprint_data)
+                    self.blueprint_data.rename_blueprint(bp_id, new_name)
+                    if self.on_modified:
+                        self.on_modified()
+                    else:
+                        self.blueprint_data.save()
+                    self.sync_blueprints()
                     messagebox.showinfo("Success", "Blueprint renamed successfully")
                 dialog.destroy()
             
@@ -337,7 +489,6 @@ class BlueprintListFrame(ttk.Frame):
             scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
             
             # Insert blueprint data
-            import json
             json_str = json.dumps(bp_data, indent=2, ensure_ascii=False)
             text_widget.insert(tk.END, json_str)
             text_widget.config(state=tk.DISABLED)
@@ -0,0 +1,113 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import os
+from src.models.blueprint_library import BlueprintLibrary
+
+class LibraryDialog(tk.Toplevel):
+    def __init__(self, parent, library: BlueprintLibrary, on_copy):
+        super().__init__(parent)
+        self.library = library
+        self.on_copy = on_copy  # Callback receiving a list of (bp_id, source_file)
+        self.results = []
+
+        self.title("Blueprint Library")
+        self.geometry("900x500")
+        self.transient(parent)
+        self.setup_ui()
+        self.run_search()
+
+    def setup_ui(self):
+        # Create search bar
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        ttk.Label(search_frame, text="Name/ID:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda e: self.run_search())
+        search_entry.focus()
+
+        ttk.Label(search_frame, text="Node type:").pack(side=tk.LEFT, padx=(10, 0))
+        self.node_type_var = tk.StringVar()
+        node_type_entry = ttk.Entry(search_frame, textvariable=self.node_type_var, width=20)
+        node_type_entry.pack(side=tk.LEFT, padx=5)
+        node_type_entry.bind("<Return>", lambda e: self.run_search())
+
+        ttk.Button(search_frame, text="Search", command=self.run_search).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="Index Folder...", command=self.index_folder).pack(side=tk.RIGHT)
+
+        # Create result list
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        self.tree = ttk.Treeview(tree_frame, columns=("name", "category", "id", "file"), show="headings")
+        self.tree.heading("name", text="Name")
+        self.tree.heading("category", text="Category")
+        self.tree.heading("id", text="ID")
+        self.tree.heading("file", text="Source File")
+        self.tree.column("name", width=200)
+        self.tree.column("category", width=120)
+        self.tree.column("id", width=100)
+        self.tree.column("file", width=400)
+
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Create buttons and info label
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        self.info_label = ttk.Label(btn_frame, text="", foreground="gray")
+        self.info_label.pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Copy to Target →", command=self.copy_selected).pack(side=tk.RIGHT, padx=5)
+
+    def run_search(self):
+        """Search the library and show the results"""
+        self.results = self.library.search(self.search_var.get().strip(),
+                                           node_type=self.node_type_var.get().strip() or None)
+
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        for index, entry in enumerate(self.results):
+            bp_id_short = entry["id"][:8] + "..." if len(entry["id"]) > 8 else entry["id"]
+            self.tree.insert("", "end", iid=str(index),
+                             values=(entry["name"], entry["category"], bp_id_short, entry["source_file"]))
+
+        stats = self.library.get_stats()
+        self.info_label.config(text=f"{len(self.results)} results | Library: "
+                                    f"{stats['blueprint_count']} blueprints in {stats['file_count']} files")
+
+    def index_folder(self):
+        """Index a folder of scene files"""
+        root_dir = filedialog.askdirectory(title="Select Scene Folder", parent=self)
+        if not root_dir:
+            return
+
+        def on_progress(file_path):
+            self.info_label.config(text=f"Indexing {os.path.basename(file_path)}...")
+            self.update_idletasks()
+
+        try:
+            stats = self.library.index_directory(root_dir, on_progress)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to index folder:\n{str(e)}", parent=self)
+            return
+
+        message = (f"Indexed: {stats['indexed']}\nUnchanged: {stats['skipped']}\n"
+                   f"Removed: {stats['removed']}\nFailed: {len(stats['failed'])}")
+        messagebox.showinfo("Index Complete", message, parent=self)
+        self.run_search()
+
+    def copy_selected(self):
+        """Copy selected library entries to the target scene"""
+        selected = [self.results[int(item)] for item in self.tree.selection()]
+        if not selected:
+            messagebox.showinfo("Info", "No blueprint selected", parent=self)
+            return
+
+        self.on_copy([(entry["id"], entry["source_file"]) for entry in selected])
@@ -1,7 +1,20 @@
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
 from src.gui.blueprint_list_frame import BlueprintListFrame
-from src.models.blueprint_data import BlueprintData
+from src.utils.auto_saver import AutoSaver
+
+# Scene models pull in the JSON, validation and backup modules; they are imported
+# on first use (or preloaded on a worker thread after the window is shown) to keep startup fast
+if TYPE_CHECKING:
+    from src.models.blueprint_data import BlueprintData
+
+# Names of the panel scenes for automation clients
+RPC_SCENE_NAMES = {"left": "source", "right": "target"}
 
 class MainWindow:
     def __init__(self, root):
@@ -13,9 +26,28 @@ class MainWindow:
         # Initialize data
         self.left_scene = None
         self.right_scene = None
+        self.library = None
+        self.savers = {"left": None, "right": None}
+        self.rpc_server = None
+        self.rpc_registry = None
+        self.rpc_calls = queue.Queue()
+        self.import_future = None  # Blueprint import being parsed in the background
         
         self.setup_ui()
         self.setup_menu()
+        
+        # Flush pending saves before closing
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_application)
+        self.poll_save_state()
+        
+        # Load the scene model modules in the background once the window has been drawn
+        self.root.after(100, lambda: threading.Thread(target=self.preload_modules, name="Preload",
+                                                      daemon=True).start())
+    
+    def preload_modules(self):
+        """Import modules needed to load scenes while the user picks a file (runs on a worker thread)"""
+        # A load started meanwhile waits on the import lock and then uses the same modules
+        import src.models.blueprint_data  # noqa: F401
     
     def setup_ui(self):
         # Create main container
@@ -55,7 +87,9 @@ class MainWindow:
         content_frame.pack(fill=tk.BOTH, expand=True)
         
         # Create left panel (source)
-        self.left_frame = BlueprintListFrame(content_frame, "Source Scene")
+        self.left_frame = BlueprintListFrame(content_frame, "Source Scene", 
+                                             on_modified=lambda: self.mark_dirty("left"),
+                                             on_paste=lambda: self.paste_blueprints("left"))
         self.left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         
         # Create center panel (controls)
@@ -88,6 +122,11 @@ class MainWindow:
         ttk.Checkbutton(copy_frame, text="Keep original ID", 
                        variable=self.keep_original_id).pack(anchor=tk.W, padx=10, pady=2)
         
+        # Referenced assets option
+        self.copy_assets = tk.BooleanVar(value=False)
+        ttk.Checkbutton(copy_frame, text="Copy referenced assets", 
+                       variable=self.copy_assets).pack(anchor=tk.W, padx=10, pady=2)
+        
         # Action buttons
         ttk.Button(copy_frame, text="Copy →", 
                   command=self.copy_to_target).pack(pady=10, fill=tk.X, padx=10)
@@ -95,13 +134,22 @@ class MainWindow:
                   command=self.copy_to_source).pack(pady=2, fill=tk.X, padx=10)
         
         # Create right panel (target)
-        self.right_frame = BlueprintListFrame(content_frame, "Target Scene")
+        self.right_frame = BlueprintListFrame(content_frame, "Target Scene", 
+                                              on_modified=lambda: self.mark_dirty("right"),
+                                              on_paste=lambda: self.paste_blueprints("right"))
         self.right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
         
         # Create status bar
-        self.status_bar = ttk.Label(main_container, text="Ready", 
+        status_frame = ttk.Frame(main_container)
+        status_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.status_bar = ttk.Label(status_frame, text="Ready", 
                                    relief=tk.SUNKEN, anchor=tk.W)
-        self.status_bar.pack(fill=tk.X, pady=(10, 0))
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.save_status = ttk.Label(status_frame, text="", width=40, 
+                                    relief=tk.SUNKEN, anchor=tk.W)
+        self.save_status.pack(side=tk.RIGHT, padx=(5, 0))
     
     def setup_menu(self):
         """Setup menu bar"""
@@ -118,15 +166,27 @@ class MainWindow:
         file_menu.add_command(label="Save Target Scene", command=self.save_target_scene)
         file_menu.add_separator()
         file_menu.add_command(label="Create New Scene...", command=self.create_new_scene)
+        file_menu.add_command(label="Import Blueprints into Source...", command=lambda: self.import_blueprints_file("left"))
+        file_menu.add_command(label="Import Blueprints into Target...", command=lambda: self.import_blueprints_file("right"))
+        file_menu.add_separator()
+        file_menu.add_command(label="Restore Source Backup...", command=lambda: self.open_backups("left"))
+        file_menu.add_command(label="Restore Target Backup...", command=lambda: self.open_backups("right"))
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Compact Scene File...", command=self.compact_scene_file)
+        file_menu.add_command(label="Blueprint Library...", command=self.open_library)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.exit_application)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Edit", menu=edit_menu)
         edit_menu.add_command(label="Copy Selected to Target", command=self.copy_to_target)
         edit_menu.add_command(label="Copy Selected to Source", command=self.copy_to_source)
+        edit_menu.add_command(label="Merge Selected into Target...", command=self.merge_to_target)
+        edit_menu.add_command(label="Paste Blueprints into Source", command=lambda: self.paste_blueprints("left"))
+        edit_menu.add_command(label="Paste Blueprints into Target", command=lambda: self.paste_blueprints("right"))
         edit_menu.add_separator()
+        edit_menu.add_command(label="Find Variable...", command=self.find_variable)
         edit_menu.add_command(label="Refresh Both Scenes", command=self.refresh_both_scenes)
         
         # Help menu
@@ -136,6 +196,8 @@ class MainWindow:
     
     def load_source_scene(self):
         """Load source scene file"""
+        from src.models.blueprint_data import BlueprintData
+        
         file_path = filedialog.askopenfilename(
             title="Select Source Scene File",
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
@@ -143,16 +205,20 @@ class MainWindow:
         
         if file_path:
             try:
-                self.left_scene = BlueprintData(file_path)
+                self.flush_scene("left")
+                self.set_scene("left", BlueprintData(file_path))
                 self.left_frame.set_file_path(file_path)
                 self.left_frame.load_blueprints(self.left_scene)
                 self.update_status(f"Source scene loaded: {file_path}")
+                self.offer_compaction("left")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load source scene:\n{str(e)}")
                 self.update_status("Failed to load source scene")
     
     def load_target_scene(self):
         """Load target scene file"""
+        from src.models.blueprint_data import BlueprintData
+        
         file_path = filedialog.askopenfilename(
             title="Select Target Scene File",
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
@@ -160,10 +226,12 @@ class MainWindow:
         
         if file_path:
             try:
-                self.right_scene = BlueprintData(file_path)
+                self.flush_scene("right")
+                self.set_scene("right", BlueprintData(file_path))
                 self.right_frame.set_file_path(file_path)
                 self.right_frame.load_blueprints(self.right_scene)
                 self.update_status(f"Target scene loaded: {file_path}")
+                self.offer_compaction("right")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load target scene:\n{str(e)}")
                 self.update_status("Failed to load target scene")
@@ -175,7 +243,7 @@ class MainWindow:
             return
         
         try:
-            self.left_scene.save()
+            self.savers["left"].flush(force=True)
             self.update_status("Source scene saved")
             messagebox.showinfo("Success", "Source scene saved successfully")
         except Exception as e:
@@ -188,7 +256,7 @@ class MainWindow:
             return
         
         try:
-            self.right_scene.save()
+            self.savers["right"].flush(force=True)
             self.update_status("Target scene saved")
             messagebox.showinfo("Success", "Target scene saved successfully")
         except Exception as e:
@@ -196,141 +264,285 @@ class MainWindow:
     
     def copy_to_target(self):
         """Copy selected blueprints from source to target"""
+        self.copy_selected("left", "right")
+    
+    def copy_to_source(self):
+        """Copy selected blueprints from target to source"""
+        self.copy_selected("right", "left")
+    
+    def copy_selected(self, from_side: str, to_side: str):
+        """Plan copying the selected blueprints, confirm conflicts once, then copy in one batch"""
         if not self.left_scene or not self.right_scene:
             messagebox.showwarning("Warning", "Please load both source and target scenes")
             return
         
-        selected_bps = self.left_frame.get_selected_blueprints()
+        from_label, to_label = ("source", "target") if from_side == "left" else ("target", "source")
+        from_scene = getattr(self, f"{from_side}_scene")
+        from_frame = getattr(self, f"{from_side}_frame")
+        
+        selected_bps = from_frame.get_selected_blueprints()
         if not selected_bps:
-            messagebox.showinfo("Info", "No blueprints selected in source scene")
+            messagebox.showinfo("Info", f"No blueprints selected in {from_label} scene")
             return
         
-        success_count = 0
-        failed_count = 0
-        for bp_id in selected_bps:
-            try:
-                bp_data = self.left_scene.get_blueprint_by_id(bp_id)
+        # Determine new names
+        new_names = None
+        if not self.auto_rename.get() and not self.replace_existing.get() and not self.keep_original_id.get():
+            new_names = {}
+            for bp_id in selected_bps:
+                bp_data = from_scene.get_blueprint_by_id(bp_id)
                 if bp_data:
-                    # Determine new name
-                    new_name = None
-                    if not self.auto_rename.get() and not self.replace_existing.get() and not self.keep_original_id.get():
-                        new_name = bp_data["name"]
-                    
-                    # Copy blueprint
-                    if self.left_scene.copy_blueprint_to_scene(
-                        bp_id, self.right_scene, new_name, self.replace_existing.get(), 
-                        self.keep_original_id.get()):
-                        success_count += 1
-                        
-                        # Remove from source if move mode
-                        if self.copy_mode.get() == "move":
-                            self.left_scene.remove_blueprint(bp_id)
-                    else:
-                        failed_count += 1
-                        if self.keep_original_id.get():
-                            messagebox.showwarning("Warning", 
-                                f"Blueprint '{bp_data['name']}' could not be copied because a blueprint with the same ID already exists in the target scene.")
+                    new_names[bp_id] = bp_data["name"]
+        
+        move = self.copy_mode.get() == "move"
+        action = "moved" if move else "copied"
+        results = self.copy_blueprints(from_scene, selected_bps, to_side, new_names, action)
+        if results is None:
+            return
+        
+        # Remove from the other scene if move mode
+        if move:
+            for bp_id, success in results.items():
+                if success:
+                    from_scene.remove_blueprint(bp_id)
+            self.mark_dirty(from_side)
+            from_frame.sync_blueprints()
+        from_frame.clear_selection()
+        
+        self.report_copy(results, action, to_label)
+    
+    def copy_blueprints(self, from_scene: 'BlueprintData', bp_ids, to_side: str, 
+                        new_names=None, action: str = "copied"):
+        """Copy blueprints into a panel scene with the current copy options; None if nothing was copied"""
+        to_scene = getattr(self, f"{to_side}_scene")
+        try:
+            plan = from_scene.plan_copy_to_scene(bp_ids, to_scene, new_names, 
+                                                 self.replace_existing.get(), self.keep_original_id.get(), 
+                                                 self.copy_assets.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to plan copy:\n{str(e)}")
+            return None
+        
+        # Report every conflict in one dialog before anything is changed
+        if not plan.accepted:
+            messagebox.showerror("Error", f"No blueprints can be {action}:\n\n{plan.format_report()}")
+            return None
+        if plan.has_conflicts:
+            if not messagebox.askyesno("Confirm Copy", 
+                                       f"{plan.format_report()}\n\nContinue?"):
+                return None
+        
+        # Copy blueprints in one batch so regenerated IDs stay consistent
+        try:
+            results = from_scene.apply_copy_plan(plan)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to copy blueprints:\n{str(e)}")
+            return None
+        
+        # Schedule save and refresh
+        self.mark_dirty(to_side)
+        getattr(self, f"{to_side}_frame").sync_blueprints()
+        return results
+    
+    def report_copy(self, results, action: str, to_label: str):
+        """Show how many blueprints were copied and rejected"""
+        copied_count = sum(1 for success in results.values() if success)
+        failed_count = len(results) - copied_count
+        
+        message = f"{copied_count} blueprints {action} to {to_label} scene"
+        if failed_count > 0:
+            message += f" ({failed_count} rejected)"
+        self.update_status(message)
+        messagebox.showinfo("Success", f"{copied_count} blueprints {action} successfully" + 
+                           (f"\n{failed_count} rejected" if failed_count > 0 else ""))
+    
+    def paste_blueprints(self, side: str):
+        """Import blueprint JSON from the clipboard into a panel scene"""
+        from src.models.blueprint_import import parse_blueprints
+        
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showinfo("Info", "The clipboard is empty")
+            return
+        self.import_blueprints(side, lambda: parse_blueprints(text, "Clipboard"), "clipboard")
+    
+    def import_blueprints_file(self, side: str):
+        """Import blueprints from a blueprint or scene JSON file into a panel scene"""
+        from src.models.blueprint_import import load_blueprints_file
+        
+        file_path = filedialog.askopenfilename(
+            title="Import Blueprints",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.import_blueprints(side, lambda: load_blueprints_file(file_path), os.path.basename(file_path))
+    
+    def import_blueprints(self, side: str, parse, source_label: str):
+        """Parse blueprint JSON in a background thread, then copy it in with the current copy options"""
+        scene_label = "source" if side == "left" else "target"
+        if not getattr(self, f"{side}_scene"):
+            messagebox.showwarning("Warning", f"Please load the {scene_label} scene first")
+            return
+        if self.import_future is not None:
+            messagebox.showinfo("Info", "Another import is still being read")
+            return
+        
+        # Large pastes take a while to parse and validate; keep the window responsive
+        future = Future()
+        
+        def run():
+            try:
+                future.set_result(parse())
             except Exception as e:
-                failed_count += 1
-                messagebox.showerror("Error", f"Failed to copy blueprint:\n{str(e)}")
-                continue
+                future.set_exception(e)
         
-        if success_count > 0:
-            # Save and refresh
-            self.right_scene.save()
-            self.right_frame.load_blueprints(self.right_scene)
-            
-            if self.copy_mode.get() == "move":
-                self.left_scene.save()
-                self.left_frame.load_blueprints(self.left_scene)
-            
-            self.left_frame.clear_selection()
-            
-            action = "moved" if self.copy_mode.get() == "move" else "copied"
-            message = f"{success_count} blueprints {action} to target scene"
-            if failed_count > 0:
-                message += f" ({failed_count} failed)"
-            self.update_status(message)
-            messagebox.showinfo("Success", f"{success_count} blueprints {action} successfully" + 
-                               (f"\n{failed_count} failed due to ID conflicts" if failed_count > 0 else ""))
-        elif failed_count > 0:
-            messagebox.showerror("Error", f"Failed to copy {failed_count} blueprints")
+        self.import_future = future
+        threading.Thread(target=run, name="BlueprintImport", daemon=True).start()
+        self.update_status(f"Reading blueprints from {source_label}...")
+        self.root.after(50, lambda: self.finish_import(side, source_label))
     
-    def copy_to_source(self):
-        """Copy selected blueprints from target to source"""
+    def finish_import(self, side: str, source_label: str):
+        """Copy parsed blueprints into the scene once the background parse is done"""
+        future = self.import_future
+        if not future.done():
+            self.root.after(50, lambda: self.finish_import(side, source_label))
+            return
+        self.import_future = None
+        
+        try:
+            imported = future.result()
+        except Exception as e:
+            self.update_status("Import failed")
+            messagebox.showerror("Error", f"Failed to import blueprints from {source_label}:\n{str(e)}")
+            return
+        
+        # The scene may have been closed while the import was read
+        if not getattr(self, f"{side}_scene"):
+            self.update_status("Import cancelled")
+            return
+        
+        bp_ids = [graph["id"] for graph in imported.data["graphs"]]
+        results = self.copy_blueprints(imported, bp_ids, side, action="imported")
+        if results is not None:
+            self.report_copy(results, "imported", "source" if side == "left" else "target")
+        else:
+            self.update_status("Import cancelled")
+    
+    def merge_to_target(self):
+        """Three-way merge selected source blueprints into the target blueprints with the same ID"""
+        from src.gui.backup_dialog import BackupDialog
+        
         if not self.left_scene or not self.right_scene:
             messagebox.showwarning("Warning", "Please load both source and target scenes")
             return
         
-        selected_bps = self.right_frame.get_selected_blueprints()
+        selected_bps = [bp_id for bp_id in self.left_frame.get_selected_blueprints() 
+                        if self.right_scene.get_blueprint_by_id(bp_id)]
         if not selected_bps:
-            messagebox.showinfo("Info", "No blueprints selected in target scene")
+            messagebox.showinfo("Info", "Select source blueprints that also exist in the target scene (same ID)")
             return
         
-        success_count = 0
-        failed_count = 0
-        for bp_id in selected_bps:
-            try:
-                bp_data = self.right_scene.get_blueprint_by_id(bp_id)
-                if bp_data:
-                    # Determine new name
-                    new_name = None
-                    if not self.auto_rename.get() and not self.replace_existing.get() and not self.keep_original_id.get():
-                        new_name = bp_data["name"]
-                    
-                    # Copy blueprint
-                    if self.right_scene.copy_blueprint_to_scene(
-                        bp_id, self.left_scene, new_name, self.replace_existing.get(), 
-                        self.keep_original_id.get()):
-                        success_count += 1
-                        
-                        # Remove from target if move mode
-                        if self.copy_mode.get() == "move":
-                            self.right_scene.remove_blueprint(bp_id)
-                    else:
-                        failed_count += 1
-                        if self.keep_original_id.get():
-                            messagebox.showwarning("Warning", 
-                                f"Blueprint '{bp_data['name']}' could not be copied because a blueprint with the same ID already exists in the source scene.")
-            except Exception as e:
-                failed_count += 1
-                messagebox.showerror("Error", f"Failed to copy blueprint:\n{str(e)}")
-                continue
+        try:
+            # Save pending changes so the current target is part of the history
+            self.flush_scene("right")
+            store = self.right_scene.get_backup_store()
+            versions = store.list_versions() if store else []
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read backups:\n{str(e)}")
+            return
         
-        if success_count > 0:
-            # Save and refresh
-            self.left_scene.save()
-            self.left_frame.load_blueprints(self.left_scene)
-            
-            if self.copy_mode.get() == "move":
-                self.right_scene.save()
-                self.right_frame.load_blueprints(self.right_scene)
+        if not versions:
+            if messagebox.askyesno("Merge", "The target scene has no backups to use as the common version.\n"
+                                   "Merge without one? Nodes and connections found on only one side are "
+                                   "kept, so deletions come back, and values that differ between the two "
+                                   "versions are listed as conflicts and keep the target version."):
+                self.merge_selected(selected_bps, None)
+            return
+        
+        # The common version is picked from the target's backup history
+        BackupDialog(self.root, "Select Common Base Version", versions, 
+                     lambda version: self.merge_selected(selected_bps, version),
+                     action_label="Merge", confirm_message="")
+    
+    def merge_selected(self, bp_ids, base_version):
+        """Merge source blueprints into the target using a backup version as the base"""
+        try:
+            base_graphs = {}
+            if base_version is not None:
+                base_data = self.right_scene.get_backup_store().restore(base_version)
+                base_graphs = {graph.get("id"): graph for graph in base_data.get("graphs", [])}
             
-            self.right_frame.clear_selection()
+            results = {bp_id: self.right_scene.merge_blueprint(bp_id, base_graphs.get(bp_id),
+                                                               self.left_scene.get_blueprint_by_id(bp_id))
+                       for bp_id in bp_ids}
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to merge blueprints:\n{str(e)}")
+            return
+        
+        # One report for the whole selection; conflicts keep the target version
+        conflict_count = sum(len(result.conflicts) for result in results.values())
+        report = [f"{len(results)} blueprints merged, {conflict_count} conflicts "
+                  f"(conflicting values keep the target version)."]
+        for bp_id, result in results.items():
+            if result.has_conflicts:
+                report.append(f"\n{result.merged.get('name', bp_id)}:\n{result.format_report(10)}")
+        if not messagebox.askyesno("Apply Merge", "\n".join(report) + "\n\nApply the merge?"):
+            return
+        
+        for bp_id, result in results.items():
+            self.right_scene.replace_blueprint(bp_id, result.merged)
+        self.mark_dirty("right")
+        self.right_frame.sync_blueprints()
+        self.update_status(f"{len(results)} blueprints merged into target scene ({conflict_count} conflicts)")
+    
+    def find_variable(self, max_lines: int = 30):
+        """Find variable definitions by name in both scenes and select the blueprints defining them"""
+        if not self.left_scene and not self.right_scene:
+            messagebox.showwarning("Warning", "Please load a scene first")
+            return
+        
+        text = simpledialog.askstring("Find Variable", "Variable name contains:", parent=self.root)
+        if text is None:
+            return
+        
+        lines = []
+        total = 0
+        for side, label in (("left", "Source"), ("right", "Target")):
+            scene = getattr(self, f"{side}_scene")
+            if not scene:
+                continue
+            matches = scene.find_variables(text)
+            total += len(matches)
+            getattr(self, f"{side}_frame").select_blueprints([match["blueprint_id"] for match in matches])
             
-            action = "moved" if self.copy_mode.get() == "move" else "copied"
-            message = f"{success_count} blueprints {action} to source scene"
-            if failed_count > 0:
-                message += f" ({failed_count} failed)"
-            self.update_status(message)
-            messagebox.showinfo("Success", f"{success_count} blueprints {action} successfully" + 
-                               (f"\n{failed_count} failed due to ID conflicts" if failed_count > 0 else ""))
-        elif failed_count > 0:
-            messagebox.showerror("Error", f"Failed to copy {failed_count} blueprints")
+            lines.append(f"{label} scene: {len(matches)} variables")
+            for match in matches[:max_lines]:
+                type_text = f" ({match['type']})" if match["type"] else ""
+                lines.append(f"  {match['name']}{type_text} in '{match['blueprint_name']}'")
+            if len(matches) > max_lines:
+                lines.append(f"  ... and {len(matches) - max_lines} more")
+        
+        self.update_status(f"{total} variables found")
+        messagebox.showinfo("Find Variable", "\n".join(lines))
     
     def refresh_both_scenes(self):
         """Refresh both scene displays"""
         if self.left_scene:
             try:
+                self.flush_scene("left")
                 self.left_scene.load()
                 self.left_frame.load_blueprints(self.left_scene)
+                self.offer_compaction("left")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to refresh source scene:\n{str(e)}")
         
         if self.right_scene:
             try:
+                self.flush_scene("right")
                 self.right_scene.load()
                 self.right_frame.load_blueprints(self.right_scene)
+                self.offer_compaction("right")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to refresh target scene:\n{str(e)}")
         
@@ -338,6 +550,8 @@ class MainWindow:
     
     def create_new_scene(self):
         """Create a new empty scene"""
+        from src.models.blueprint_data import BlueprintData
+        
         file_path = filedialog.asksaveasfilename(
             title="Create New Scene File",
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
@@ -369,12 +583,14 @@ class MainWindow:
                 )
                 
                 if result is True:  # Yes - load as source
-                    self.left_scene = new_scene
+                    self.flush_scene("left")
+                    self.set_scene("left", new_scene)
                     self.left_frame.set_file_path(file_path)
                     self.left_frame.load_blueprints(self.left_scene)
                     self.update_status(f"New source scene created: {file_path}")
                 elif result is False:  # No - load as target
-                    self.right_scene = new_scene
+                    self.flush_scene("right")
+                    self.set_scene("right", new_scene)
                     self.right_frame.set_file_path(file_path)
                     self.right_frame.load_blueprints(self.right_scene)
                     self.update_status(f"New target scene created: {file_path}")
@@ -382,6 +598,293 @@ class MainWindow:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to create new scene:\n{str(e)}")
     
+    def set_scene(self, side: str, scene: 'BlueprintData'):
+        """Set the scene of a panel and start its background saver"""
+        old_saver = self.savers[side]
+        if old_saver:
+            old_saver.stop()
+        
+        setattr(self, f"{side}_scene", scene)
+        self.savers[side] = AutoSaver(scene)
+        if self.rpc_registry:
+            self.rpc_registry.add(RPC_SCENE_NAMES[side], scene, self.savers[side])
+    
+    def mark_dirty(self, side: str):
+        """Mark a scene as modified so it is saved in the background"""
+        saver = self.savers[side]
+        if saver:
+            saver.mark_dirty()
+        self.update_save_status()
+    
+    def flush_scene(self, side: str):
+        """Save pending changes of a scene immediately"""
+        saver = self.savers[side]
+        if saver:
+            saver.flush()
+    
+    def exit_application(self):
+        """Save pending changes and exit"""
+        for side, label in (("left", "source"), ("right", "target")):
+            saver = self.savers[side]
+            if not saver:
+                continue
+            try:
+                saver.flush()
+            except Exception as e:
+                if not messagebox.askyesno("Error", f"Failed to save {label} scene:\n{str(e)}\n\nExit anyway?"):
+                    return
+        
+        if self.rpc_server:
+            self.rpc_server.stop()
+            self.rpc_registry.close_all()
+        self.root.quit()
+    
+    def poll_save_state(self):
+        """Periodically refresh the save state shown in the status bar"""
+        self.update_save_status()
+        
+        for side, label in (("left", "source"), ("right", "target")):
+            saver = self.savers[side]
+            error = saver.take_error() if saver else None
+            if error:
+                self.update_status(f"Failed to save {label} scene: {error}")
+        
+        self.root.after(250, self.poll_save_state)
+    
+    def update_save_status(self):
+        """Show dirty/saving state of both scenes"""
+        parts = []
+        for side, label in (("left", "Source"), ("right", "Target")):
+            saver = self.savers[side]
+            if not saver:
+                continue
+            if saver.is_saving:
+                parts.append(f"{label}: saving...")
+            elif saver.is_dirty:
+                parts.append(f"{label}: unsaved changes")
+            else:
+                parts.append(f"{label}: saved")
+        self.save_status.config(text=" | ".join(parts))
+    
+    def start_rpc_server(self, port: int = None, unix_path: str = None, token: str = None):
+        """Serve the panel scenes to automation clients as 'source' and 'target'"""
+        from src.server.blueprint_service import BlueprintService, SceneRegistry
+        from src.server.rpc_server import RpcServer, DEFAULT_PORT, generate_token, write_token_file
+        
+        self.rpc_registry = SceneRegistry()
+        for side, name in RPC_SCENE_NAMES.items():
+            scene = getattr(self, f"{side}_scene")
+            if scene:
+                self.rpc_registry.add(name, scene, self.savers[side])
+        
+        # TCP is reachable by any local process or web page, so clients must authenticate
+        generated = token is None and not unix_path
+        if generated:
+            token = generate_token()
+        
+        service = BlueprintService(self.rpc_registry, on_change=self.on_rpc_change)
+        self.rpc_server = RpcServer(service, port=port or DEFAULT_PORT, unix_path=unix_path,
+                                    dispatcher=self.dispatch_rpc_call, token=token)
+        self.rpc_server.start_in_thread()
+        self.process_rpc_calls()
+        status = f"Automation server listening on {self.rpc_server.address}"
+        if generated:
+            # Not shown in the window, which may be streamed or recorded
+            status += f", token written to {write_token_file(token)}"
+        self.update_status(status)
+    
+    def dispatch_rpc_call(self, call) -> Future:
+        """Queue an automation call to run on the GUI thread"""
+        future = Future()
+        self.rpc_calls.put((call, future))
+        return future
+    
+    def process_rpc_calls(self):
+        """Run queued automation calls; scenes and widgets are only touched from this thread"""
+        while True:
+            try:
+                call, future = self.rpc_calls.get_nowait()
+            except queue.Empty:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(call())
+            except Exception as e:
+                future.set_exception(e)
+        
+        self.root.after(20, self.process_rpc_calls)
+    
+    def on_rpc_change(self, name: str):
+        """Refresh a panel after an automation client changed its scene"""
+        for side, scene_name in RPC_SCENE_NAMES.items():
+            if scene_name == name:
+                getattr(self, f"{side}_frame").sync_blueprints()
+                self.update_save_status()
+    
+    def open_backups(self, side: str):
+        """Open the backup history of a scene"""
+        from src.gui.backup_dialog import BackupDialog
+        
+        scene = getattr(self, f"{side}_scene")
+        label = "source" if side == "left" else "target"
+        if not scene or not scene.file_path:
+            messagebox.showwarning("Warning", f"No {label} scene loaded")
+            return
+        
+        try:
+            # Save pending changes so they are part of the history
+            self.flush_scene(side)
+            versions = scene.get_backup_store().list_versions()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read backups:\n{str(e)}")
+            return
+        
+        if not versions:
+            messagebox.showinfo("Info", f"No backups recorded for the {label} scene yet")
+            return
+        
+        def on_restore(version):
+            try:
+                scene.restore_backup(version)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to restore backup:\n{str(e)}")
+                return
+            getattr(self, f"{side}_frame").load_blueprints(scene)
+            self.mark_dirty(side)
+            self.update_status(f"{label.capitalize()} scene restored to backup version {version}")
+        
+        BackupDialog(self.root, f"{label.capitalize()} Scene Backups", versions, on_restore)
+    
+    def compact_scene_file(self):
+        """Prune garbage from a scene file and rewrite it without whitespace"""
+        from src.models.blueprint_data import BlueprintData
+        
+        file_path = filedialog.askopenfilename(
+            title="Select Scene File to Compact",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        # Compact a loaded scene in memory so the panel stays in sync
+        side = None
+        for panel_side in ("left", "right"):
+            scene = getattr(self, f"{panel_side}_scene")
+            if scene and scene.file_path and os.path.abspath(scene.file_path) == os.path.abspath(file_path):
+                side = panel_side
+        
+        try:
+            if side:
+                self.flush_scene(side)
+                scene = getattr(self, f"{side}_scene")
+            else:
+                # Not validated: compaction also repairs scenes the loader rejects
+                scene = BlueprintData()
+                scene.file_path = file_path
+                scene.load(validate=False)
+            plan = scene.plan_compaction()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to analyze scene:\n{str(e)}")
+            return
+        
+        if not messagebox.askyesno("Compact Scene", 
+                                   f"{os.path.basename(file_path)}\n\n{plan.format_report()}\n\n"
+                                   "Compact the scene? The current file is kept in the backup history."):
+            return
+        
+        try:
+            scene.apply_compaction(plan)
+            if side:
+                getattr(self, f"{side}_frame").sync_blueprints()
+                self.savers[side].flush(force=True)
+            else:
+                scene.save()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to compact scene:\n{str(e)}")
+            return
+        
+        self.update_save_status()
+        self.update_status(f"Scene compacted: {plan.removed_count} items removed, "
+                           f"{plan.bytes_saved / 1024:.1f} KB saved")
+    
+    def offer_compaction(self, side: str):
+        """Offer to compact a scene that loaded with duplicate IDs or references to missing nodes or graphs"""
+        scene = getattr(self, f"{side}_scene")
+        warnings = scene.load_warnings
+        if not warnings:
+            return
+        
+        max_lines = 5
+        lines = [f"{os.path.basename(scene.file_path)} has {len(warnings)} duplicate blueprint IDs or references "
+                 f"to missing nodes or blueprints:"]
+        lines.extend(f"  {warning}" for warning in warnings[:max_lines])
+        if len(warnings) > max_lines:
+            lines.append(f"  ... and {len(warnings) - max_lines} more")
+        lines.append("")
+        lines.append("Compact the scene to repair them? Duplicates get new IDs, broken references are removed, "
+                     "and the current file is kept in the backup history.")
+        if not messagebox.askyesno("Scene Problems", "\n".join(lines)):
+            return
+        
+        try:
+            plan = scene.plan_compaction(measure=False)
+            scene.apply_compaction(plan)
+            scene.load_warnings = []
+            getattr(self, f"{side}_frame").sync_blueprints()
+            self.savers[side].flush(force=True)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to compact scene:\n{str(e)}")
+            return
+        
+        self.update_save_status()
+        self.update_status(f"Scene compacted: {plan.removed_count} items removed, "
+                           f"{plan.duplicate_ids} duplicate IDs regenerated")
+    
+    def open_library(self):
+        """Open the blueprint library dialog"""
+        from src.gui.library_dialog import LibraryDialog
+        from src.models.blueprint_library import BlueprintLibrary
+        
+        if not self.library:
+            try:
+                self.library = BlueprintLibrary()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to open blueprint library:\n{str(e)}")
+                return
+        
+        LibraryDialog(self.root, self.library, self.copy_from_library)
+    
+    def copy_from_library(self, entries):
+        """Copy library entries to the target scene in one batch, like blueprints selected in the source scene"""
+        if not self.right_scene:
+            messagebox.showwarning("Warning", "Please load a target scene")
+            return
+        
+        try:
+            library_scene, skipped = self.library.build_scene(entries)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read blueprints from the library:\n{str(e)}")
+            return
+        
+        if skipped:
+            max_lines = 10
+            lines = [f"{len(skipped)} entries are no longer in the library or share an ID "
+                     "with another selected entry and will be skipped:"]
+            lines.extend(f"  {bp_id} in {os.path.basename(source_file)}" for bp_id, source_file in skipped[:max_lines])
+            if len(skipped) > max_lines:
+                lines.append(f"  ... and {len(skipped) - max_lines} more")
+            if not library_scene.data["graphs"]:
+                messagebox.showerror("Error", "\n".join(lines))
+                return
+            if not messagebox.askyesno("Library Copy", "\n".join(lines) + "\n\nContinue?"):
+                return
+        
+        bp_ids = [graph["id"] for graph in library_scene.data["graphs"]]
+        results = self.copy_blueprints(library_scene, bp_ids, "right", action="copied from library")
+        if results is not None:
+            self.report_copy(results, "copied from library", "target")
+    
     def show_about(self):
         """Show about dialog"""
         about_text = """Warudo Blueprint Copy Tool v1.0
@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Optional, Set, Tuple
+from src.utils.id_remapper import UUID_PATTERN, UUID_LENGTH
+
+# Keys Warudo has used for an asset's type
+TYPE_KEYS = ("type", "typeId", "typeName")
+
+def asset_type(asset: Dict[str, Any]) -> str:
+    for key in TYPE_KEYS:
+        value = asset.get(key)
+        if isinstance(value, str):
+            return value
+    return ""
+
+def content_hash(asset: Dict[str, Any]) -> str:
+    """Hash an asset's contents apart from its ID, so copies under a new ID match"""
+    content = {key: value for key, value in asset.items() if key != "id"}
+    raw = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def collect_ids(obj: Any) -> Set[str]:
+    """Get every UUID in a graph, including IDs embedded in serialized values, in one traversal"""
+    found = set()
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is str:
+            if len(value) == UUID_LENGTH:
+                found.add(value)
+            elif len(value) > UUID_LENGTH:
+                found.update(UUID_PATTERN.findall(value))
+        elif value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list:
+            stack.extend(value)
+    return found
+
+class AssetIndex:
+    """Index of a scene's assets and of the assets each blueprint references.
+
+    Graphs are scanned once for the IDs they contain and kept until the graph is
+    replaced; references are the scanned IDs that belong to an asset, so changes
+    to the asset list need no rescan.
+    """
+
+    def __init__(self):
+        self._scanned: Dict[int, Tuple[Dict[str, Any], Set[str]]] = {}  # id(graph) -> (graph, IDs)
+        self._hashes: Dict[int, Tuple[Dict[str, Any], str]] = {}  # id(asset) -> (asset, content hash)
+        self.assets: Dict[str, Dict[str, Any]] = {}  # Asset ID -> asset
+        self._by_hash: Optional[Dict[str, str]] = None
+
+    def sync(self, data: Dict[str, Any]):
+        """Bring the index up to date with the scene's graphs and assets"""
+        scanned = {}
+        for graph in data.get("graphs", []):
+            cached = self._scanned.get(id(graph))
+            scanned[id(graph)] = cached if cached is not None and cached[0] is graph else (graph, collect_ids(graph))
+        self._scanned = scanned
+
+        assets = {}
+        for asset in data.get("assets", []):
+            if isinstance(asset, dict) and isinstance(asset.get("id"), str):
+                assets.setdefault(asset["id"], asset)
+        if assets.keys() != self.assets.keys() or any(asset is not self.assets[asset_id]
+                                                       for asset_id, asset in assets.items()):
+            self.assets = assets
+            self._by_hash = None
+            live = {id(asset) for asset in assets.values()}
+            self._hashes = {key: cached for key, cached in self._hashes.items() if key in live}
+
+    def references(self, graph: Dict[str, Any]) -> List[str]:
+        """Get the IDs of the assets a graph references"""
+        cached = self._scanned.get(id(graph))
+        ids = cached[1] if cached is not None and cached[0] is graph else collect_ids(graph)
+        return sorted(asset_id for asset_id in ids if asset_id in self.assets)
+
+    def content_hash(self, asset_id: str) -> str:
+        asset = self.assets[asset_id]
+        cached = self._hashes.get(id(asset))
+        if cached is None or cached[0] is not asset:
+            cached = (asset, content_hash(asset))
+            self._hashes[id(asset)] = cached
+        return cached[1]
+
+    def find_by_hash(self, digest: str) -> Optional[str]:
+        """Get the ID of an asset with the given contents"""
+        if self._by_hash is None:
+            self._by_hash = {}
+            for asset_id in self.assets:
+                self._by_hash.setdefault(self.content_hash(asset_id), asset_id)
+        return self._by_hash.get(digest)
+
+    def summary(self, asset_id: str) -> Dict[str, str]:
+        asset = self.assets[asset_id]
+        return {"id": asset_id, "name": asset.get("name", ""), "type": asset_type(asset)}
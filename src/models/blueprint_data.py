@@ -1,88 +1,175 @@
 from src.utils.json_handler import JsonHandler
-from typing import Dict, Any, List, Optional
-import copy
+from src.utils.backup_store import BackupStore
+from src.models.copy_plan import CopyPlan, plan_copy, apply_copy_plan
+from src.models.graph_merge import MergeResult, merge_graphs
+from src.models.scene_compactor import CompactionPlan, plan_compaction, apply_compaction
+from src.models.variable_index import VariableIndex
+from src.models.asset_index import AssetIndex
+from src.models.category_tree import CategoryTree, CategoryPath, copy_hierarchy, format_path, is_blueprint_id
+from typing import Dict, Any, List, Optional, Union
+import os
+import threading
 
 class BlueprintData:
+    # Record a backup version beside the scene file on every save
+    backups_enabled = True
+    
     def __init__(self, file_path: str = None):
         self.file_path = file_path
         self.data = {}
+        # Guards self.data while it is modified or copied for a save
+        self.lock = threading.RLock()
+        # Keeps saves from different threads from writing the file at the same time
+        self._save_lock = threading.Lock()
+        self._category_tree = None
+        self._variable_index = VariableIndex()
+        self._asset_index = AssetIndex()
+        self._backup_store = None
+        self.compact_json = False  # Write without whitespace, as the file was
+        self.load_warnings: List[str] = []  # Duplicate IDs and missing references found by load()
         if file_path:
             self.load()
     
-    def load(self):
+    def load(self, validate: bool = True):
         """Load blueprint data from JSON file"""
-        self.data = JsonHandler.load_json(self.file_path)
-        if not JsonHandler.validate_warudo_scene(self.data):
-            raise ValueError("Invalid Warudo scene format")
+        if validate:
+            # Graphs are validated while the file is parsed so malformed scenes fail fast
+            warnings = []
+            self.data = JsonHandler.load_scene(self.file_path, warnings)
+            self.load_warnings = warnings
+        else:
+            # Used to repair scenes the validator rejects
+            self.data = JsonHandler.load_json(self.file_path)
+            self.load_warnings = []
+        self.compact_json = JsonHandler.is_compact_file(self.file_path)
+        self._category_tree = None
     
     def save(self):
-        """Save blueprint data to JSON file"""
-        if self.file_path:
-            JsonHandler.save_json(self.file_path, self.data)
+        """Save blueprint data to JSON file.
+
+        Only copying the scene holds the lock, so edits go on while the backup
+        and the file are written.
+        """
+        if not self.file_path:
+            return
+        with self._save_lock:
+            with self.lock:
+                file_path = self.file_path
+                compact_json = self.compact_json
+                data = self._snapshot()
+            
+            backup_store = self.get_backup_store() if self.backups_enabled else None
+            if backup_store:
+                # Keep the version being overwritten and the one being written
+                backup_store.record(data, file_path)
+            
+            JsonHandler.save_json(file_path, data, compact_json)
+            
+            if backup_store:
+                backup_store.mark_saved(file_path)
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Copy the parts of the scene that edits change in place; graphs and assets are replaced, not edited"""
+        data = dict(self.data)
+        for key in ("graphs", "assets"):
+            if isinstance(data.get(key), list):
+                data[key] = list(data[key])
+        for key in ("graphHierarchy", "assetHierarchy"):
+            if isinstance(data.get(key), dict):
+                data[key] = copy_hierarchy(data[key])
+        return data
+    
+    def get_backup_store(self) -> Optional[BackupStore]:
+        """Get the backup history kept beside the scene file"""
+        if not self.file_path:
+            return None
+        if self._backup_store is None or self._backup_store.scene_path != os.path.abspath(self.file_path):
+            self._backup_store = BackupStore.for_scene(self.file_path)
+        return self._backup_store
+    
+    def restore_backup(self, version: int):
+        """Replace the scene data with a backup version (not saved until save() is called)"""
+        data = self.get_backup_store().restore(version)
+        with self.lock:
+            self.data = data
+            self._category_tree = None
     
     def get_blueprint_list(self) -> List[Dict[str, Any]]:
         """Get list of all blueprints in the scene"""
         if not self.data or "graphs" not in self.data:
             return []
         
-        # Build category mapping from graphHierarchy
-        category_map = self._build_category_map()
+        # Get category paths from graphHierarchy
+        category_paths = self.get_category_tree().blueprint_paths() if "graphHierarchy" in self.data else {}
+        variables = self.get_variable_index()
         
         blueprints = []
         for graph in self.data["graphs"]:
+            category_path = category_paths.get(graph.get("id", ""), ())
+            variable_count = len(variables.variables_of(graph))
             bp_info = {
                 "id": graph.get("id", ""),
                 "name": graph.get("name", "Unknown"),
                 "enabled": graph.get("enabled", True),
                 "order": graph.get("order", 0),
                 "group": graph.get("group", None),
-                "category": category_map.get(graph.get("id", ""), "Uncategorized"),
+                "category": format_path(category_path),
+                "category_path": category_path,
                 "node_count": len(graph.get("nodes", {})),
                 "connection_count": len(graph.get("dataConnections", [])) + len(graph.get("flowConnections", [])),
-                "has_variables": len(graph.get("properties", {}).get("dataInputs", {}).get("Variables", {}).get("value", "[]")) > 2
+                "variable_count": variable_count,
+                "has_variables": variable_count > 0
             }
             blueprints.append(bp_info)
         
         return blueprints
     
-    def _build_category_map(self) -> Dict[str, str]:
-        """Build mapping from blueprint ID to category name"""
-        category_map = {}
-        
-        if not self.data or "graphHierarchy" not in self.data:
-            return category_map
-        
-        def traverse_hierarchy(node, current_category=""):
-            if not node:
-                return
-            
-            key = node.get("key", "")
-            children = node.get("children", [])
-            
-            if children:
-                # This is a category node
-                category_name = key if key else "Uncategorized"
-                for child in children:
-                    traverse_hierarchy(child, category_name)
-            else:
-                # This is a blueprint node (leaf)
-                if key and self._is_blueprint_id(key):
-                    category_map[key] = current_category or "Uncategorized"
+    def get_category_tree(self) -> CategoryTree:
+        """Get the category index of the graph hierarchy, building it on first use"""
+        if "graphHierarchy" not in self.data:
+            self.data["graphHierarchy"] = {
+                "collapsed": False,
+                "key": "",
+                "children": []
+            }
         
-        # Start traversal from root
         hierarchy_root = self.data["graphHierarchy"]
-        if "children" in hierarchy_root:
-            for child in hierarchy_root["children"]:
-                traverse_hierarchy(child)
+        if self._category_tree is None or self._category_tree.root is not hierarchy_root:
+            self._category_tree = CategoryTree(hierarchy_root)
+        return self._category_tree
+    
+    def get_variable_index(self) -> VariableIndex:
+        """Get the variable index of the scene, parsing only graphs changed since the last call"""
+        self._variable_index.sync(self.data.get("graphs", []) if self.data else [])
+        return self._variable_index
+    
+    def get_asset_index(self) -> AssetIndex:
+        """Get the asset index of the scene, scanning only graphs changed since the last call"""
+        self._asset_index.sync(self.data or {})
+        return self._asset_index
+    
+    def get_referenced_assets(self, bp_id: str) -> List[Dict[str, str]]:
+        """Get the ID, name and type of the assets a blueprint references"""
+        graph = self.get_blueprint_by_id(bp_id)
+        if not graph:
+            return []
+        index = self.get_asset_index()
+        return [index.summary(asset_id) for asset_id in index.references(graph)]
+    
+    def find_variables(self, text: str = "") -> List[Dict[str, Any]]:
+        """Find variable definitions whose name contains text"""
+        return self.get_variable_index().find(text)
+    
+    def _build_category_map(self) -> Dict[str, str]:
+        """Build mapping from blueprint ID to category path"""
+        if not self.data or "graphHierarchy" not in self.data:
+            return {}
         
-        return category_map
+        return {bp_id: format_path(path) for bp_id, path in self.get_category_tree().blueprint_paths().items()}
     
     def _is_blueprint_id(self, key: str) -> bool:
         """Check if a key is a blueprint ID (UUID format)"""
-        import re
-        # UUID pattern: 8-4-4-4-12 hexadecimal characters
-        uuid_pattern = r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'
-        return bool(re.match(uuid_pattern, key.lower()))
+        return is_blueprint_id(key)
     
     def get_blueprint_by_id(self, bp_id: str) -> Optional[Dict[str, Any]]:
         """Get blueprint data by ID"""
@@ -108,143 +195,102 @@ class BlueprintData:
                                new_name: str = None, replace_existing: bool = False, 
                                keep_original_id: bool = False) -> bool:
         """Copy a blueprint to another scene"""
-        source_bp = self.get_blueprint_by_id(bp_id)
-        if not source_bp:
-            return False
-        
-        # Create deep copy of the blueprint
-        new_bp = copy.deepcopy(source_bp)
-        
-        # Generate new ID if not replacing and not keeping original ID
-        if not replace_existing and not keep_original_id:
-            import uuid
-            new_bp["id"] = str(uuid.uuid4())
-        
-        # Set new name if provided
-        if new_name:
-            new_bp["name"] = new_name
-        
-        # Initialize target scene data if needed
-        if not target_scene.data:
-            target_scene.data = {
-                "name": "New Scene",
-                "appVersion": "0.13.1",
-                "graphs": []
-            }
-        
-        if "graphs" not in target_scene.data:
-            target_scene.data["graphs"] = []
-        
-        # Check if blueprint with same ID already exists (when keeping original ID)
-        if keep_original_id:
-            existing_bp_with_id = target_scene.get_blueprint_by_id(new_bp["id"])
-            if existing_bp_with_id and not replace_existing:
-                # If same ID exists and not replacing, this is an error
-                return False
-            elif existing_bp_with_id and replace_existing:
-                # Remove existing blueprint with same ID
-                target_scene.data["graphs"] = [g for g in target_scene.data["graphs"] 
-                                             if g.get("id") != new_bp["id"]]
-        
-        # Check if blueprint with same name already exists
-        existing_bp = target_scene.get_blueprint_by_name(new_bp["name"])
-        if existing_bp and not replace_existing and not keep_original_id:
-            # Generate unique name only if not keeping original ID
-            base_name = new_bp["name"]
-            counter = 1
-            while target_scene.get_blueprint_by_name(f"{base_name} ({counter})"):
-                counter += 1
-            new_bp["name"] = f"{base_name} ({counter})"
-        elif existing_bp and replace_existing:
-            # Remove existing blueprint with same name
-            target_scene.data["graphs"] = [g for g in target_scene.data["graphs"] 
-                                         if g.get("name") != new_bp["name"]]
-        
-        # Add the new blueprint
-        target_scene.data["graphs"].append(new_bp)
-        
-        # Update graph hierarchy if needed
-        source_category = self._get_blueprint_category(bp_id)
-        self._update_graph_hierarchy(target_scene, new_bp, source_category)
-        
-        return True
+        new_names = {bp_id: new_name} if new_name else None
+        results = self.copy_blueprints_to_scene([bp_id], target_scene, new_names, 
+                                                replace_existing, keep_original_id)
+        return results[bp_id]
     
-    def _get_blueprint_category(self, bp_id: str) -> str:
-        """Get the category of a blueprint from graph hierarchy"""
-        category_map = self._build_category_map()
-        return category_map.get(bp_id, "Bp")
+    def copy_blueprints_to_scene(self, bp_ids: List[str], target_scene: 'BlueprintData', 
+                                 new_names: Dict[str, str] = None, replace_existing: bool = False, 
+                                 keep_original_id: bool = False, copy_assets: bool = False) -> Dict[str, bool]:
+        """Copy a batch of blueprints to another scene, returning success per blueprint ID"""
+        plan = self.plan_copy_to_scene(bp_ids, target_scene, new_names, replace_existing, keep_original_id, 
+                                       copy_assets)
+        return self.apply_copy_plan(plan)
     
-    def _update_graph_hierarchy(self, target_scene: 'BlueprintData', new_bp: Dict[str, Any], category: str = "Bp"):
-        """Update graph hierarchy to include the new blueprint with proper category"""
-        if "graphHierarchy" not in target_scene.data:
-            target_scene.data["graphHierarchy"] = {
-                "collapsed": False,
-                "key": "",
-                "children": []
-            }
-        
-        # Find or create the category group
-        category_group = None
-        for child in target_scene.data["graphHierarchy"]["children"]:
-            if child.get("key") == category:
-                category_group = child
-                break
-        
-        if not category_group:
-            category_group = {
-                "collapsed": False,
-                "key": category,
-                "children": []
-            }
-            target_scene.data["graphHierarchy"]["children"].append(category_group)
-        
-        # Add new blueprint to hierarchy
-        bp_hierarchy_entry = {
-            "collapsed": False,
-            "key": new_bp["id"],
-            "children": None
-        }
-        
-        # Check if already exists
-        existing_entry = None
-        for child in category_group["children"]:
-            if child.get("key") == new_bp["id"]:
-                existing_entry = child
-                break
-        
-        if not existing_entry:
-            category_group["children"].append(bp_hierarchy_entry)
+    def plan_copy_to_scene(self, bp_ids: List[str], target_scene: 'BlueprintData', 
+                           new_names: Dict[str, str] = None, replace_existing: bool = False, 
+                           keep_original_id: bool = False, copy_assets: bool = False) -> CopyPlan:
+        """Work out what copying a batch would add, replace, rename or reject, without changing anything"""
+        return plan_copy(self, bp_ids, target_scene, new_names, replace_existing, keep_original_id, copy_assets)
+    
+    def apply_copy_plan(self, plan: CopyPlan) -> Dict[str, bool]:
+        """Apply a planned copy in one batch; fails if the target changed since planning"""
+        return apply_copy_plan(plan)
+    
+    def _get_blueprint_category(self, bp_id: str) -> CategoryPath:
+        """Get the category path of a blueprint from graph hierarchy"""
+        path = self.get_category_tree().get_path(bp_id)
+        return path if path is not None else ("Bp",)
+    
+    def _update_graph_hierarchy(self, target_scene: 'BlueprintData', new_bp: Dict[str, Any], 
+                                category: Union[str, CategoryPath] = "Bp"):
+        """Update graph hierarchy to include the new blueprint at the same category path"""
+        category_path = (category,) if isinstance(category, str) else tuple(category)
+        target_scene.get_category_tree().add_blueprint(new_bp["id"], category_path)
     
     def remove_blueprint(self, bp_id: str) -> bool:
         """Remove a blueprint from the scene"""
         if not self.data or "graphs" not in self.data:
             return False
         
-        # Remove from graphs
-        original_count = len(self.data["graphs"])
-        self.data["graphs"] = [g for g in self.data["graphs"] if g.get("id") != bp_id]
+        with self.lock:
+            # Remove from graphs
+            original_count = len(self.data["graphs"])
+            self.data["graphs"] = [g for g in self.data["graphs"] if g.get("id") != bp_id]
+            
+            if len(self.data["graphs"]) == original_count:
+                return False  # Blueprint not found
+            
+            # Remove from hierarchy
+            self._remove_from_hierarchy(bp_id)
         
-        if len(self.data["graphs"]) == original_count:
-            return False  # Blueprint not found
+        return True
+    
+    def rename_blueprint(self, bp_id: str, new_name: str) -> bool:
+        """Rename a blueprint in the scene"""
+        bp_data = self.get_blueprint_by_id(bp_id)
+        if not bp_data:
+            return False
         
-        # Remove from hierarchy
-        self._remove_from_hierarchy(bp_id)
+        # A renamed copy replaces the graph, so a save in progress keeps writing the old one
+        return self.replace_blueprint(bp_id, dict(bp_data, name=new_name))
+    
+    def merge_blueprint(self, bp_id: str, base_graph: Optional[Dict[str, Any]], other_graph: Dict[str, Any], 
+                        prefer: str = "ours") -> MergeResult:
+        """Three-way merge another version of a blueprint with the one in this scene (not applied)"""
+        our_graph = self.get_blueprint_by_id(bp_id)
+        if not our_graph:
+            raise ValueError(f"Blueprint {bp_id} not found")
+        return merge_graphs(base_graph, our_graph, other_graph, prefer)
+    
+    def replace_blueprint(self, bp_id: str, graph: Dict[str, Any]) -> bool:
+        """Replace a blueprint in place, keeping its position and category"""
+        if not self.data or "graphs" not in self.data:
+            return False
         
-        return True
+        with self.lock:
+            for index, existing in enumerate(self.data["graphs"]):
+                if existing.get("id") == bp_id:
+                    self.data["graphs"][index] = graph
+                    return True
+        return False
+    
+    def plan_compaction(self, measure: bool = True) -> CompactionPlan:
+        """Find orphan hierarchy entries, empty groups, dangling connections and duplicate IDs without changing anything"""
+        return plan_compaction(self.data, self.compact_json, measure)
+    
+    def apply_compaction(self, plan: CompactionPlan):
+        """Remove what a compaction plan found and save without whitespace from now on"""
+        apply_compaction(self, plan)
+        self._category_tree = None
     
     def _remove_from_hierarchy(self, bp_id: str):
         """Remove blueprint from graph hierarchy"""
         if "graphHierarchy" not in self.data:
             return
         
-        def remove_recursive(node):
-            if "children" in node and node["children"]:
-                node["children"] = [child for child in node["children"] 
-                                  if child.get("key") != bp_id]
-                for child in node["children"]:
-                    remove_recursive(child)
-        
-        remove_recursive(self.data["graphHierarchy"])
+        self.get_category_tree().remove_blueprint(bp_id)
     
     def get_scene_info(self) -> Dict[str, Any]:
         """Get basic scene information"""
@@ -0,0 +1,49 @@
+import json
+import os
+from typing import Any
+from src.models.blueprint_data import BlueprintData
+from src.utils.scene_validator import SceneValidator, SceneValidationError, StreamingSceneValidator, graph_location
+
+def _is_graph(obj: Any) -> bool:
+    return isinstance(obj, dict) and "nodes" in obj and "id" in obj
+
+def parse_blueprints(text: str, name: str = "Imported") -> BlueprintData:
+    """Parse JSON holding one blueprint, a list of blueprints or a whole scene into an unsaved scene.
+
+    Graphs are validated as soon as each one has been parsed, so malformed input
+    fails without parsing the rest. Raises ValueError describing the problem.
+    """
+    validator = StreamingSceneValidator()
+    try:
+        data = json.loads(text.lstrip("\ufeff"), object_hook=validator)
+
+        if isinstance(data, dict) and "graphs" in data:
+            validator.finish(data)
+            scene_data = data
+        else:
+            graphs = data if isinstance(data, list) else [data]
+            if not graphs or not all(_is_graph(graph) for graph in graphs):
+                raise ValueError("Expected a blueprint, a list of blueprints or a scene")
+            if validator.graph_count != len(graphs):
+                # Graphs without connection lists are not recognised while parsing
+                for index, graph in enumerate(graphs):
+                    SceneValidator.validate_graph(graph, graph_location(index, graph))
+            # Without a scene hierarchy there is no telling which of two blueprints sharing an ID is meant
+            duplicates = SceneValidator.find_duplicate_ids(graphs)
+            if duplicates:
+                raise ValueError(f"Invalid blueprint data: {duplicates[0]}")
+            scene_data = {"name": name, "appVersion": "0.13.1", "graphs": graphs}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}") from e
+    except SceneValidationError as e:
+        raise ValueError(f"Invalid blueprint data: {e}") from e
+
+    scene = BlueprintData()
+    scene.data = scene_data
+    return scene
+
+def load_blueprints_file(file_path: str) -> BlueprintData:
+    """Read a blueprint or scene JSON file for import"""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        text = f.read()
+    return parse_blueprints(text, os.path.splitext(os.path.basename(file_path))[0])
@@ -0,0 +1,283 @@
+from src.models.blueprint_data import BlueprintData
+from src.models.category_tree import CategoryTree, CategoryPath, format_path
+from src.models.asset_index import collect_ids
+from src.utils.json_handler import JsonHandler
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import os
+import sqlite3
+
+DEFAULT_LIBRARY_PATH = os.path.join(os.path.expanduser("~"), ".warudo_bp_copy", "library.sqlite")
+
+# Recorded in PRAGMA user_version so a later schema change can recognise existing libraries
+SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS blueprints (
+    id TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    node_types TEXT NOT NULL,
+    file_mtime REAL NOT NULL,
+    graph_json TEXT NOT NULL,
+    PRIMARY KEY (id, source_file)
+);
+CREATE TABLE IF NOT EXISTS assets (
+    id TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    category TEXT NOT NULL,
+    asset_json TEXT NOT NULL,
+    PRIMARY KEY (id, source_file)
+);
+CREATE TABLE IF NOT EXISTS blueprint_node_types (
+    id TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    node_type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blueprints_name ON blueprints (name);
+CREATE INDEX IF NOT EXISTS idx_blueprints_hash ON blueprints (content_hash);
+CREATE INDEX IF NOT EXISTS idx_node_types_type ON blueprint_node_types (node_type);
+CREATE INDEX IF NOT EXISTS idx_node_types_bp ON blueprint_node_types (id, source_file);
+PRAGMA user_version = {SCHEMA_VERSION};
+"""
+
+class BlueprintLibrary:
+    """Local SQLite index of blueprints found in a directory tree of scene files"""
+
+    def __init__(self, db_path: str = DEFAULT_LIBRARY_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def encode_category(path: Sequence[str]) -> str:
+        """Store a category path as a JSON array so names may contain '/'"""
+        return json.dumps(list(path), ensure_ascii=False)
+
+    @staticmethod
+    def decode_category(value: str) -> CategoryPath:
+        return tuple(json.loads(value))
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+    @staticmethod
+    def content_hash(graph: Dict[str, Any]) -> str:
+        """Get a stable hash of a blueprint's content"""
+        canonical = json.dumps(graph, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def node_types(graph: Dict[str, Any]) -> List[str]:
+        """Get the sorted set of node type IDs used by a blueprint"""
+        nodes = graph.get("nodes") or {}
+        types = set()
+        for node in nodes.values():
+            if isinstance(node, dict) and node.get("typeId"):
+                types.add(node["typeId"])
+        return sorted(types)
+
+    def index_directory(self, root_dir: str, progress=None) -> Dict[str, Any]:
+        """Index all scene files below a directory, skipping files that have not changed"""
+        root_dir = os.path.abspath(root_dir)
+        stats = {"indexed": 0, "skipped": 0, "removed": 0, "failed": []}
+
+        known = {row["path"]: (row["mtime"], row["size"])
+                 for row in self.conn.execute("SELECT path, mtime, size FROM files")}
+
+        seen = set()
+        for dir_path, dir_names, file_names in os.walk(root_dir):
+            # Skip hidden folders such as scene backup stores
+            dir_names[:] = [name for name in dir_names if not name.startswith(".")]
+            for file_name in file_names:
+                if not file_name.lower().endswith(".json"):
+                    continue
+
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                seen.add(file_path)
+
+                # Skip unchanged files
+                if known.get(file_path) == (stat.st_mtime, stat.st_size):
+                    stats["skipped"] += 1
+                    continue
+
+                if progress:
+                    progress(file_path)
+
+                error = self._index_file(file_path, stat.st_mtime, stat.st_size)
+                if error:
+                    stats["failed"].append((file_path, error))
+                else:
+                    stats["indexed"] += 1
+
+        # Drop files that no longer exist under this root
+        root_prefix = os.path.join(root_dir, "")
+        for file_path in known:
+            if file_path.startswith(root_prefix) and file_path not in seen:
+                self._remove_file(file_path)
+                stats["removed"] += 1
+
+        self.conn.commit()
+        return stats
+
+    def _index_file(self, file_path: str, mtime: float, size: int) -> Optional[str]:
+        """Index a single scene file, returning an error message on failure"""
+        self._remove_file(file_path)
+
+        try:
+            scene = BlueprintData()
+            scene.data = JsonHandler.load_scene(file_path)
+        except Exception as e:
+            # Remember the failure so unchanged broken files are skipped as well
+            self.conn.execute("INSERT INTO files (path, mtime, size, error) VALUES (?, ?, ?, ?)",
+                              (file_path, mtime, size, str(e)))
+            return str(e)
+
+        category_paths = scene.get_category_tree().blueprint_paths() if "graphHierarchy" in scene.data else {}
+        bp_rows = []
+        type_rows = []
+        for graph in scene.data["graphs"]:
+            bp_id = graph.get("id", "")
+            if not bp_id:
+                continue
+            types = self.node_types(graph)
+            bp_rows.append((
+                bp_id, file_path, graph.get("name", "Unknown"),
+                self.encode_category(category_paths.get(bp_id, ())),
+                self.content_hash(graph), "\n".join(types), mtime,
+                json.dumps(graph, ensure_ascii=False)
+            ))
+            type_rows.extend((bp_id, file_path, node_type) for node_type in types)
+
+        # Assets are kept so blueprints can be copied together with the assets they reference
+        asset_hierarchy = scene.data.get("assetHierarchy")
+        asset_paths = CategoryTree(asset_hierarchy).blueprint_paths() if isinstance(asset_hierarchy, dict) else {}
+        asset_rows = [(asset["id"], file_path, self.encode_category(asset_paths.get(asset["id"], ())),
+                       json.dumps(asset, ensure_ascii=False))
+                      for asset in scene.data.get("assets") or []
+                      if isinstance(asset, dict) and isinstance(asset.get("id"), str)]
+
+        self.conn.execute("INSERT INTO files (path, mtime, size, error) VALUES (?, ?, ?, NULL)",
+                          (file_path, mtime, size))
+        self.conn.executemany("INSERT OR REPLACE INTO blueprints VALUES (?, ?, ?, ?, ?, ?, ?, ?)", bp_rows)
+        self.conn.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)", asset_rows)
+        self.conn.executemany("INSERT INTO blueprint_node_types VALUES (?, ?, ?)", type_rows)
+        return None
+
+    def _remove_file(self, file_path: str):
+        """Remove a file and its blueprints from the index"""
+        self.conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+        self.conn.execute("DELETE FROM blueprints WHERE source_file = ?", (file_path,))
+        self.conn.execute("DELETE FROM assets WHERE source_file = ?", (file_path,))
+        self.conn.execute("DELETE FROM blueprint_node_types WHERE source_file = ?", (file_path,))
+
+    def search(self, text: str = "", category: Sequence[str] = None, node_type: str = None,
+               limit: int = 500) -> List[Dict[str, Any]]:
+        """Search indexed blueprints by name/ID text, category path and node type"""
+        query = ("SELECT id, source_file, name, category, content_hash, node_types, file_mtime "
+                 "FROM blueprints b WHERE 1 = 1")
+        params = []
+
+        if text:
+            query += " AND (b.name LIKE ? ESCAPE '\\' OR b.id LIKE ? ESCAPE '\\')"
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params.extend([pattern, pattern])
+
+        if category is not None:
+            query += " AND b.category = ?"
+            params.append(self.encode_category(category))
+
+        if node_type:
+            query += (" AND EXISTS (SELECT 1 FROM blueprint_node_types t "
+                      "WHERE t.id = b.id AND t.source_file = b.source_file AND t.node_type LIKE ?)")
+            params.append(f"%{node_type}%")
+
+        query += " ORDER BY b.category, b.name LIMIT ?"
+        params.append(limit)
+
+        results = []
+        for row in self.conn.execute(query, params):
+            entry = dict(row)
+            entry["node_types"] = entry["node_types"].split("\n") if entry["node_types"] else []
+            entry["category_path"] = self.decode_category(entry["category"])
+            entry["category"] = format_path(entry["category_path"])
+            results.append(entry)
+        return results
+
+    def get_blueprint(self, bp_id: str, source_file: str) -> Optional[Dict[str, Any]]:
+        """Get the stored blueprint graph of a library entry"""
+        row = self.conn.execute("SELECT graph_json FROM blueprints WHERE id = ? AND source_file = ?",
+                                (bp_id, source_file)).fetchone()
+        if not row:
+            return None
+        return json.loads(row["graph_json"])
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get basic library statistics"""
+        return {
+            "file_count": self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            "blueprint_count": self.conn.execute("SELECT COUNT(*) FROM blueprints").fetchone()[0]
+        }
+
+    def build_scene(self, entries: Sequence[Tuple[str, str]]) -> Tuple[BlueprintData, List[Tuple[str, str]]]:
+        """Gather library entries into one unsaved scene so they can be copied in a single batch.
+
+        Blueprints keep their category paths and bring the assets they reference.
+        Returns the scene and the entries left out: those no longer in the library
+        and those whose ID an earlier entry already uses.
+        """
+        scene = BlueprintData()
+        scene.data = {
+            "name": "Library",
+            "appVersion": "0.13.1",
+            "graphs": [],
+            "assets": []
+        }
+        tree = scene.get_category_tree()
+        asset_tree = None
+        skipped = []
+        asset_ids_by_file: Dict[str, set] = {}
+        added_assets = set()
+
+        for bp_id, source_file in entries:
+            row = self.conn.execute("SELECT category, graph_json FROM blueprints WHERE id = ? AND source_file = ?",
+                                    (bp_id, source_file)).fetchone()
+            if row is None or tree.get_path(bp_id) is not None:
+                skipped.append((bp_id, source_file))
+                continue
+
+            graph = json.loads(row["graph_json"])
+            scene.data["graphs"].append(graph)
+            tree.add_blueprint(bp_id, self.decode_category(row["category"]))
+
+            if source_file not in asset_ids_by_file:
+                asset_ids_by_file[source_file] = {asset_row["id"] for asset_row in self.conn.execute(
+                    "SELECT id FROM assets WHERE source_file = ?", (source_file,))}
+            for asset_id in sorted(collect_ids(graph) & asset_ids_by_file[source_file] - added_assets):
+                asset_row = self.conn.execute("SELECT category, asset_json FROM assets WHERE id = ? AND source_file = ?",
+                                              (asset_id, source_file)).fetchone()
+                scene.data["assets"].append(json.loads(asset_row["asset_json"]))
+                if asset_tree is None:
+                    scene.data["assetHierarchy"] = {"collapsed": False, "key": "", "children": []}
+                    asset_tree = CategoryTree(scene.data["assetHierarchy"])
+                asset_tree.add_blueprint(asset_id, self.decode_category(asset_row["category"]))
+                added_assets.add(asset_id)
+
+        return scene, skipped
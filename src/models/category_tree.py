@@ -0,0 +1,167 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+# UUID pattern: 8-4-4-4-12 hexadecimal characters
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+CATEGORY_SEPARATOR = "/"
+
+CategoryPath = Tuple[str, ...]
+
+def is_blueprint_id(key: str) -> bool:
+    """Check if a key is a blueprint ID (UUID format)"""
+    return bool(UUID_RE.match(key.lower()))
+
+def format_path(path: CategoryPath) -> str:
+    """Format a category path for display"""
+    return CATEGORY_SEPARATOR.join(path) if path else "Uncategorized"
+
+def parse_path(category: str) -> CategoryPath:
+    """Parse a displayed category back into a path"""
+    if not category or category == "Uncategorized":
+        return ()
+    return tuple(category.split(CATEGORY_SEPARATOR))
+
+def copy_hierarchy(root: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the nodes and child lists of a hierarchy, which CategoryTree changes in place"""
+    copied_root = dict(root)
+    stack = [copied_root]
+    while stack:
+        node = stack.pop()
+        children = node.get("children")
+        if isinstance(children, list):
+            node["children"] = copied = [dict(child) if isinstance(child, dict) else child for child in children]
+            stack.extend(child for child in copied if isinstance(child, dict))
+    return copied_root
+
+class HierarchyUndoLog:
+    """Child lists of the hierarchy nodes a batch of changes touched, as they were before it"""
+
+    def __init__(self):
+        self._saved: Dict[int, Tuple[Dict[str, Any], Any]] = {}
+
+    def save(self, node: Dict[str, Any]):
+        """Remember a node's children before its first change"""
+        if id(node) not in self._saved:
+            children = node.get("children")
+            self._saved[id(node)] = (node, list(children) if isinstance(children, list) else children)
+
+    def revert(self):
+        """Put back every saved child list; trees built over the hierarchy must be rebuilt"""
+        for node, children in self._saved.values():
+            node["children"] = children
+        self._saved.clear()
+
+class CategoryTree:
+    """Index over a graphHierarchy tree with full category paths.
+
+    Lookups by path and by blueprint ID are dictionary lookups. The index keeps
+    references to the hierarchy nodes, so changes made through it are applied
+    to the scene data directly.
+    """
+
+    def __init__(self, root: Dict[str, Any]):
+        self.root = root
+        self.undo_log: Optional[HierarchyUndoLog] = None  # Records changed nodes while set
+        self.groups: Dict[CategoryPath, Dict[str, Any]] = {}
+        # Blueprint ID -> [(parent group, entry)], normally a single placement
+        self.entries: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]] = {}
+        self.paths: Dict[str, CategoryPath] = {}
+        self._build()
+
+    def _build(self):
+        self.groups[()] = self.root
+        stack = [(self.root, ())]
+        while stack:
+            group, path = stack.pop()
+            for child in group.get("children") or []:
+                if not isinstance(child, dict):
+                    continue
+                key = child.get("key", "")
+                if child.get("children"):
+                    # This is a category node
+                    self._add_group(child, path + (key or "Uncategorized",), stack)
+                elif key and is_blueprint_id(key):
+                    # This is a blueprint node (leaf)
+                    self.entries.setdefault(key, []).append((group, child))
+                    self.paths.setdefault(key, path)
+                elif key:
+                    # Empty category node
+                    self._add_group(child, path + (key,), stack)
+
+    def _add_group(self, node: Dict[str, Any], path: CategoryPath, stack: list):
+        # The first group wins if a path appears twice
+        self.groups.setdefault(path, node)
+        stack.append((node, path))
+
+    def get_path(self, bp_id: str) -> Optional[CategoryPath]:
+        """Get the category path of a blueprint"""
+        return self.paths.get(bp_id)
+
+    def get_group(self, path: CategoryPath) -> Optional[Dict[str, Any]]:
+        """Get the hierarchy node of a category path"""
+        return self.groups.get(tuple(path))
+
+    def ensure_group(self, path: CategoryPath) -> Dict[str, Any]:
+        """Get the hierarchy node of a category path, creating missing groups"""
+        path = tuple(path)
+        group = self.groups.get(path)
+        if group is not None:
+            # Empty groups are saved with null children
+            if group.get("children") is None:
+                self._before_change(group)
+                group["children"] = []
+            return group
+
+        parent = self.ensure_group(path[:-1])
+        group = {
+            "collapsed": False,
+            "key": path[-1],
+            "children": []
+        }
+        self._before_change(parent)
+        parent["children"].append(group)
+        self.groups[path] = group
+        return group
+
+    def add_blueprint(self, bp_id: str, path: CategoryPath):
+        """Place a blueprint in a category path, moving it if it is placed elsewhere"""
+        path = tuple(path)
+        if self.paths.get(bp_id) == path:
+            return
+        self.remove_blueprint(bp_id)
+
+        group = self.ensure_group(path)
+        entry = {
+            "collapsed": False,
+            "key": bp_id,
+            "children": None
+        }
+        self._before_change(group)
+        group["children"].append(entry)
+        self.entries[bp_id] = [(group, entry)]
+        self.paths[bp_id] = path
+
+    def remove_blueprint(self, bp_id: str) -> bool:
+        """Remove every hierarchy entry of a blueprint"""
+        placements = self.entries.pop(bp_id, None)
+        self.paths.pop(bp_id, None)
+        if not placements:
+            return False
+
+        for group, entry in placements:
+            children = group.get("children") or []
+            for index, child in enumerate(children):
+                if child is entry:
+                    self._before_change(group)
+                    del children[index]
+                    break
+        return True
+
+    def _before_change(self, node: Dict[str, Any]):
+        if self.undo_log is not None:
+            self.undo_log.save(node)
+
+    def blueprint_paths(self) -> Dict[str, CategoryPath]:
+        """Get the category path of every placed blueprint"""
+        return self.paths
@@ -0,0 +1,421 @@
+import copy
+import uuid
+from typing import Dict, Any, List, Tuple
+from src.models.category_tree import CategoryTree, HierarchyUndoLog
+from src.utils.id_remapper import IdRemapper
+
+# Planned outcome of each blueprint in a batch
+ADD = "add"
+REPLACE = "replace"
+RENAME = "rename"
+REJECT = "reject"
+
+ACTION_LABELS = {ADD: "Added", REPLACE: "Replaced", RENAME: "Renamed", REJECT: "Rejected"}
+
+# Planned outcome of each referenced asset
+ASSET_REUSE = "reuse"  # The target already has an asset with the same contents
+ASSET_NEW_ID = "new id"  # The ID is taken in the target, so the copy gets a new one
+
+ASSET_ACTIONS = (ADD, ASSET_NEW_ID, REPLACE, ASSET_REUSE, REJECT)
+ASSET_LABELS = {ADD: "added", ASSET_NEW_ID: "added with a new ID", REPLACE: "replaced",
+                ASSET_REUSE: "already in target", REJECT: "rejected"}
+
+class CopyPlan:
+    """Planned result of copying a batch of blueprints, computed without changing either scene.
+
+    Each item is a dict with the source blueprint ID, the action, the final name
+    and, for replacements, the names of the target blueprints that are removed.
+    """
+
+    def __init__(self, source_scene, target_scene, replace_existing: bool, keep_original_id: bool,
+                 copy_assets: bool = False):
+        self.source_scene = source_scene
+        self.target_scene = target_scene
+        self.replace_existing = replace_existing
+        self.keep_original_id = keep_original_id
+        self.copy_assets = copy_assets
+        self.items: List[Dict[str, Any]] = []
+        self.assets: List[Dict[str, Any]] = []  # Referenced assets with their planned action
+        self.asset_map: Dict[str, str] = {}  # Source asset ID -> different ID in the target
+        self.target_assets: List[Dict[str, Any]] = []  # Target assets when planned
+        self.target_graphs: List[Dict[str, Any]] = []  # Target graphs when planned
+        self.kept_graphs: List[bool] = []  # Per target graph: still present after the copy
+        self.live_slots: List[bool] = []  # Per target graph and planned addition
+        self.results: Dict[str, bool] = {}
+
+    def counts(self) -> Dict[str, int]:
+        """Count planned items per action"""
+        counts = {ADD: 0, REPLACE: 0, RENAME: 0, REJECT: 0}
+        for item in self.items:
+            counts[item["action"]] += 1
+        return counts
+
+    @property
+    def accepted(self) -> List[Dict[str, Any]]:
+        return [item for item in self.items if item["action"] != REJECT]
+
+    @property
+    def variable_collisions(self) -> List[Dict[str, Any]]:
+        """Variables of copied blueprints that another blueprint in the target already defines"""
+        return [dict(collision, blueprint=item["final_name"])
+                for item in self.items for collision in item.get("variable_collisions", ())]
+
+    @property
+    def has_conflicts(self) -> bool:
+        """Check if anything other than plain additions is planned, or variables collide"""
+        return any(item["action"] != ADD or item.get("variable_collisions") for item in self.items) or \
+            any(asset["action"] in (ASSET_NEW_ID, REPLACE, REJECT) for asset in self.assets)
+
+    def format_report(self, max_lines: int = 30) -> str:
+        """Describe the plan for a confirmation dialog"""
+        counts = self.counts()
+        lines = [", ".join(f"{counts[action]} {ACTION_LABELS[action].lower()}"
+                           for action in (ADD, REPLACE, RENAME, REJECT) if counts[action])]
+        if self.assets:
+            asset_counts = {action: 0 for action in ASSET_ACTIONS}
+            for asset in self.assets:
+                asset_counts[asset["action"]] += 1
+            lines.append("Assets: " + ", ".join(f"{asset_counts[action]} {ASSET_LABELS[action]}"
+                                                for action in ASSET_ACTIONS if asset_counts[action]))
+
+        details = []
+        for item in self.items:
+            if item["action"] == RENAME:
+                details.append(f"Rename: '{item['name']}' → '{item['final_name']}'")
+            elif item["action"] == REPLACE:
+                details.append(f"Replace: {', '.join(repr(name) for name in item['replaces'])} "
+                               f"with '{item['final_name']}'")
+            elif item["action"] == REJECT:
+                details.append(f"Reject: '{item['name'] or item['id']}' ({item['reason']})")
+        for asset in self.assets:
+            if asset["action"] == REJECT:
+                details.append(f"Reject asset: '{asset['name'] or asset['id']}' ({asset['reason']})")
+            elif asset["action"] == REPLACE:
+                details.append(f"Replace asset: '{asset['name'] or asset['id']}'")
+            elif asset["action"] == ASSET_NEW_ID:
+                details.append(f"New asset ID: '{asset['name'] or asset['id']}' ({asset['reason']})")
+        for collision in self.variable_collisions:
+            details.append(f"Variable '{collision['variable']}' of '{collision['blueprint']}' is already defined by "
+                           f"{', '.join(repr(name) for name in collision['defined_by'])}")
+
+        if details:
+            lines.append("")
+            lines.extend(details[:max_lines])
+            if len(details) > max_lines:
+                lines.append(f"... and {len(details) - max_lines} more")
+        return "\n".join(lines)
+
+    def outcomes(self) -> Dict[str, Dict[str, Any]]:
+        """Get per source blueprint ID whether it is copied, and the ID and name it gets in the target"""
+        outcomes = {}
+        for item in self.items:
+            copied = item["action"] != REJECT
+            outcomes[item["id"]] = {"ok": copied,
+                                    "id": item["new_id"] if copied else None,
+                                    "name": item["final_name"] if copied else None}
+        return outcomes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the plan as plain JSON values"""
+        return {
+            "counts": self.counts(),
+            "items": [{key: value for key, value in item.items() if key not in ("id_map", "slot")} for item in self.items],
+            "assets": self.assets
+        }
+
+def plan_copy(source_scene, bp_ids: List[str], target_scene, new_names: Dict[str, str] = None,
+              replace_existing: bool = False, keep_original_id: bool = False,
+              copy_assets: bool = False) -> CopyPlan:
+    """Plan a batch copy against ID and name indexes of the target.
+
+    Conflicts are resolved the same way a one-by-one copy would resolve them,
+    including conflicts between blueprints of the same batch.
+    """
+    plan = CopyPlan(source_scene, target_scene, replace_existing, keep_original_id, copy_assets)
+
+    graphs_by_id = {}
+    for graph in source_scene.data.get("graphs", []) if source_scene.data else []:
+        graphs_by_id.setdefault(graph.get("id"), graph)
+
+    # Regenerate IDs if not replacing and not keeping original ID.
+    # One remapper covers the whole batch so cross-references stay consistent.
+    remapper = None
+    if not replace_existing and not keep_original_id:
+        remapper = IdRemapper.for_graphs(graphs_by_id[bp_id] for bp_id in dict.fromkeys(bp_ids)
+                                         if bp_id in graphs_by_id)
+
+    # Slots are the target graphs followed by planned additions; removed slots are dead
+    target_graphs = list(target_scene.data.get("graphs", [])) if target_scene.data else []
+    plan.target_graphs = target_graphs
+    live = [True] * len(target_graphs)
+    slot_names = [graph.get("name") for graph in target_graphs]
+    slot_ids = [graph.get("id") for graph in target_graphs]
+    ids_index: Dict[Any, set] = {}
+    names_index: Dict[Any, set] = {}
+    for slot, (graph_id, name) in enumerate(zip(slot_ids, slot_names)):
+        ids_index.setdefault(graph_id, set()).add(slot)
+        names_index.setdefault(name, set()).add(slot)
+
+    def remove_slots(slots) -> List[str]:
+        removed = []
+        for slot in sorted(slots):
+            live[slot] = False
+            ids_index[slot_ids[slot]].discard(slot)
+            names_index[slot_names[slot]].discard(slot)
+            removed.append(slot_names[slot])
+        return removed
+
+    copied = set()
+    for bp_id in bp_ids:
+        source_bp = graphs_by_id.get(bp_id)
+        if not source_bp:
+            plan.items.append({"id": bp_id, "name": None, "final_name": None, "action": REJECT,
+                               "reason": "not found in source scene"})
+            plan.results[bp_id] = False
+            continue
+
+        id_map = None
+        if remapper and bp_id in copied:
+            # Repeated copies of the same blueprint need their own IDs
+            id_map = dict(remapper.id_map)
+            id_map.update(IdRemapper.for_graphs([source_bp]).id_map)
+        elif remapper:
+            id_map = remapper.id_map
+        copied.add(bp_id)
+
+        new_id = id_map.get(source_bp["id"], source_bp["id"]) if id_map else source_bp["id"]
+        name = (new_names.get(bp_id) if new_names else None) or source_bp["name"]
+        item = {"id": bp_id, "new_id": new_id, "name": name, "final_name": name,
+                "action": ADD, "replaces": [], "id_map": id_map}
+
+        # Replacing also keeps the original ID, so it replaces a blueprint with that ID too
+        if (keep_original_id or replace_existing) and ids_index.get(new_id):
+            if not replace_existing:
+                item.update(action=REJECT, reason="a blueprint with the same ID exists in the target scene")
+                plan.items.append(item)
+                plan.results[bp_id] = False
+                continue
+            item["replaces"].extend(remove_slots(ids_index[new_id]))
+
+        if names_index.get(name):
+            if not replace_existing and not keep_original_id:
+                counter = 1
+                while names_index.get(f"{name} ({counter})"):
+                    counter += 1
+                item["final_name"] = f"{name} ({counter})"
+                item["action"] = RENAME
+            elif replace_existing:
+                item["replaces"].extend(remove_slots(names_index[name]))
+
+        if item["replaces"]:
+            item["action"] = REPLACE
+
+        slot = len(slot_ids)
+        item["slot"] = slot
+        live.append(True)
+        slot_ids.append(new_id)
+        slot_names.append(item["final_name"])
+        ids_index.setdefault(new_id, set()).add(slot)
+        names_index.setdefault(item["final_name"], set()).add(slot)
+        plan.items.append(item)
+        plan.results[bp_id] = True
+
+    plan.live_slots = live
+    plan.kept_graphs = live[:len(target_graphs)]
+    _find_variable_collisions(plan, graphs_by_id)
+    if copy_assets:
+        _plan_assets(plan, graphs_by_id)
+    return plan
+
+def _find_variable_collisions(plan: CopyPlan, graphs_by_id: Dict[Any, Dict[str, Any]]):
+    """Record variables of copied blueprints that the target, or an earlier copy, already defines"""
+    source_index = plan.source_scene.get_variable_index()
+    target_index = plan.target_scene.get_variable_index()
+    removed = {id(graph) for graph, keep in zip(plan.target_graphs, plan.kept_graphs) if not keep}
+
+    copied_names: Dict[str, List[str]] = {}  # Variable name -> copied blueprints defining it
+    for item in plan.accepted:
+        if not plan.live_slots[item["slot"]]:
+            continue
+        collisions = []
+        for variable in source_index.variables_of(graphs_by_id[item["id"]]):
+            defined_by = [graph.get("name") for graph, _variable in target_index.by_name.get(variable["name"], ())
+                          if id(graph) not in removed]
+            defined_by.extend(copied_names.get(variable["name"], ()))
+            if defined_by:
+                collisions.append({"variable": variable["name"], "type": variable["type"], "defined_by": defined_by})
+        for variable in source_index.variables_of(graphs_by_id[item["id"]]):
+            copied_names.setdefault(variable["name"], []).append(item["final_name"])
+        if collisions:
+            item["variable_collisions"] = collisions
+
+def _plan_assets(plan: CopyPlan, graphs_by_id: Dict[Any, Dict[str, Any]]):
+    """Plan the assets referenced by the copied blueprints.
+
+    Assets whose contents the target (or an earlier asset of the batch) already
+    has are reused; ID collisions are resolved like blueprint ID collisions.
+    """
+    source_assets = plan.source_scene.get_asset_index()
+    target_assets = plan.target_scene.get_asset_index()
+    plan.target_assets = list(plan.target_scene.data.get("assets", [])) if plan.target_scene.data else []
+
+    planned = set()
+    planned_hashes: Dict[str, str] = {}  # Content hash -> ID of an asset the batch adds
+    copied_items = [item for item in plan.accepted if plan.live_slots[item["slot"]]]
+    for item in copied_items:
+        item["assets"] = source_assets.references(graphs_by_id[item["id"]])
+        for asset_id in item["assets"]:
+            if asset_id in planned:
+                continue
+            planned.add(asset_id)
+
+            asset = dict(source_assets.summary(asset_id), new_id=asset_id, action=ADD)
+            digest = source_assets.content_hash(asset_id)
+            existing = target_assets.find_by_hash(digest) or planned_hashes.get(digest)
+            if existing is not None:
+                asset.update(action=ASSET_REUSE, new_id=existing)
+            elif asset_id in target_assets.assets:
+                if plan.replace_existing:
+                    asset["action"] = REPLACE
+                elif plan.keep_original_id:
+                    asset.update(action=REJECT, reason="an asset with the same ID exists in the target scene")
+                else:
+                    asset.update(action=ASSET_NEW_ID, new_id=str(uuid.uuid4()),
+                                 reason="an asset with the same ID exists in the target scene")
+            if asset["action"] in (ADD, ASSET_NEW_ID, REPLACE):
+                planned_hashes[digest] = asset["new_id"]
+            if asset["new_id"] != asset_id:
+                plan.asset_map[asset_id] = asset["new_id"]
+            plan.assets.append(asset)
+
+    # Copies reference the assets under their ID in the target
+    for item in copied_items:
+        if any(asset_id in plan.asset_map for asset_id in item["assets"]):
+            if item["id_map"] is None:
+                item["id_map"] = {}
+            item["id_map"].update(plan.asset_map)
+
+def _apply_assets(plan: CopyPlan, undo: '_UndoLog'):
+    """Add or replace the planned assets and place new ones at their source asset category"""
+    source_data = plan.source_scene.data
+    target_data = plan.target_scene.data
+    source_assets = plan.source_scene.get_asset_index()
+    remapper = IdRemapper(plan.asset_map)
+
+    assets = target_data.setdefault("assets", [])
+    positions = {asset.get("id"): index for index, asset in enumerate(assets) if isinstance(asset, dict)}
+    source_hierarchy = source_data.get("assetHierarchy")
+    source_tree = CategoryTree(source_hierarchy) if isinstance(source_hierarchy, dict) else None
+    target_tree = CategoryTree(target_data.setdefault("assetHierarchy", {
+        "collapsed": False,
+        "key": "",
+        "children": []
+    }))
+    target_tree.undo_log = undo.hierarchy
+
+    for asset in plan.assets:
+        if asset["action"] not in (ADD, ASSET_NEW_ID, REPLACE):
+            continue
+        # References between copied assets follow their new IDs too
+        new_asset = remapper.remap(source_assets.assets[asset["id"]])
+        if asset["action"] == REPLACE:
+            position = positions[asset["id"]]
+            undo.replaced_assets.append((position, assets[position]))
+            assets[position] = new_asset
+            continue
+        assets.append(new_asset)
+        path = source_tree.get_path(asset["id"]) if source_tree else None
+        target_tree.add_blueprint(asset["new_id"], path or ())
+
+class _UndoLog:
+    """What applying a plan changed in place, so a failed apply can be reverted without copying the scene"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.missing_keys = [key for key in ("graphHierarchy", "assetHierarchy", "assets") if key not in data]
+        self.asset_count = len(data.get("assets") or [])  # Assets past this were appended
+        self.replaced_assets: List[Tuple[int, Any]] = []  # (position, asset before)
+        self.hierarchy = HierarchyUndoLog()
+
+    def revert(self, scene):
+        self.hierarchy.revert()
+        assets = self.data.get("assets")
+        if isinstance(assets, list):
+            for position, asset in reversed(self.replaced_assets):
+                assets[position] = asset
+            del assets[self.asset_count:]
+        for key in self.missing_keys:
+            self.data.pop(key, None)
+        scene._category_tree = None
+
+def apply_copy_plan(plan: CopyPlan) -> Dict[str, bool]:
+    """Apply a plan to the target scene in one batch, returning success per blueprint ID"""
+    source_scene = plan.source_scene
+    target_scene = plan.target_scene
+
+    with target_scene.lock:
+        current_graphs = target_scene.data.get("graphs", []) if target_scene.data else []
+        if len(current_graphs) != len(plan.target_graphs) or \
+                any(graph is not planned for graph, planned in zip(current_graphs, plan.target_graphs)):
+            raise ValueError("The target scene changed after the copy was planned")
+        if plan.assets:
+            current_assets = target_scene.data.get("assets", []) if target_scene.data else []
+            if len(current_assets) != len(plan.target_assets) or \
+                    any(asset is not planned for asset, planned in zip(current_assets, plan.target_assets)):
+                raise ValueError("The target scene assets changed after the copy was planned")
+
+        # Initialize target scene data if needed
+        if not target_scene.data:
+            target_scene.data = {
+                "name": "New Scene",
+                "appVersion": "0.13.1",
+                "graphs": []
+            }
+
+        graphs_by_id = {}
+        for graph in source_scene.data.get("graphs", []):
+            graphs_by_id.setdefault(graph.get("id"), graph)
+
+        added = []
+        for item in plan.accepted:
+            source_bp = graphs_by_id[item["id"]]
+            if item["id_map"] is not None:
+                new_bp = IdRemapper(item["id_map"]).remap(source_bp)
+            else:
+                new_bp = copy.deepcopy(source_bp)
+            new_bp["name"] = item["final_name"]
+            added.append((item, new_bp))
+
+        kept = [graph for graph, keep in zip(plan.target_graphs, plan.kept_graphs) if keep]
+        final_added = [(item, new_bp) for item, new_bp in added if plan.live_slots[item["slot"]]]
+        new_graphs = kept + [new_bp for _item, new_bp in final_added]
+        # Look up source categories before the target hierarchy changes; it may be the same scene
+        placements = [(new_bp, source_scene._get_blueprint_category(item["id"])) for item, new_bp in final_added]
+
+        # The hierarchy and assets are updated before the graph list is swapped in,
+        # and the changes are reverted if that fails, so a failed apply leaves the scene unchanged
+        undo = _UndoLog(target_scene.data)
+        tree = target_scene.get_category_tree()
+        tree.undo_log = undo.hierarchy
+        try:
+            # Drop hierarchy entries of replaced blueprints whose ID is gone
+            final_ids = {graph.get("id") for graph in new_graphs}
+            removed_ids = {graph.get("id") for graph, keep in zip(plan.target_graphs, plan.kept_graphs) if not keep}
+            for graph_id in removed_ids - final_ids:
+                tree.remove_blueprint(graph_id)
+
+            # Place copies at the category path they had in the source scene
+            for new_bp, category in placements:
+                source_scene._update_graph_hierarchy(target_scene, new_bp, category)
+
+            if plan.assets:
+                _apply_assets(plan, undo)
+        except Exception:
+            undo.revert(target_scene)
+            raise
+        finally:
+            tree.undo_log = None
+
+        target_scene.data["graphs"] = new_graphs
+
+    return dict(plan.results)
@@ -0,0 +1,200 @@
+import copy
+from typing import Dict, Any, List, Optional, Tuple
+
+CONNECTION_KEYS = ("dataConnections", "flowConnections")
+
+# Conflict kinds
+MODIFY_MODIFY = "modify/modify"
+MODIFY_DELETE = "modify/delete"
+DANGLING = "dangling connection"
+
+class _Missing:
+    """Marker for a key that does not exist in one version"""
+
+    def __repr__(self):
+        return "<missing>"
+
+    def __deepcopy__(self, memo):
+        return self
+
+MISSING = _Missing()
+
+class MergeResult:
+    """Merged graph plus the conflicts that were resolved by preference"""
+
+    def __init__(self, merged: Dict[str, Any], conflicts: List[Dict[str, Any]]):
+        self.merged = merged
+        self.conflicts = conflicts
+
+    @property
+    def has_conflicts(self) -> bool:
+        return bool(self.conflicts)
+
+    def format_report(self, max_lines: int = 30) -> str:
+        """Describe the conflicts for a dialog"""
+        if not self.conflicts:
+            return "No conflicts"
+        lines = [f"{len(self.conflicts)} conflicts:"]
+        for conflict in self.conflicts[:max_lines]:
+            resolution = "removed" if conflict["resolution"] == "removed" else f"kept {conflict['resolution']}"
+            lines.append(f"{conflict['path']}: {conflict['kind']} ({resolution})")
+        if len(self.conflicts) > max_lines:
+            lines.append(f"... and {len(self.conflicts) - max_lines} more")
+        return "\n".join(lines)
+
+def connection_key(connection: Dict[str, Any]) -> Tuple:
+    """Identify a connection by its endpoints"""
+    return (connection.get("sourceNode"), connection.get("sourcePort"),
+            connection.get("destNode"), connection.get("destPort"))
+
+class GraphMerger:
+    """Three-way merge of blueprint graphs at node, connection and property granularity.
+
+    Nodes are joined by node ID and connections by their endpoints, so each
+    version is visited once. Changes made on only one side are taken as they
+    are; values changed differently on both sides are conflicts, resolved with
+    the preferred side and reported with their path.
+    """
+
+    def __init__(self, prefer: str = "ours"):
+        if prefer not in ("ours", "theirs"):
+            raise ValueError(f"prefer must be 'ours' or 'theirs', not {prefer!r}")
+        self.prefer = prefer
+        self.conflicts: List[Dict[str, Any]] = []
+
+    def merge(self, base: Optional[Dict[str, Any]], ours: Dict[str, Any], theirs: Dict[str, Any]) -> MergeResult:
+        """Merge two edited versions of a graph given their common base (None if unknown)"""
+        self.conflicts = []
+        base = base or {}
+
+        merged = {}
+        for key in _union_keys(ours, theirs, base):
+            base_value = base.get(key, MISSING)
+            our_value = ours.get(key, MISSING)
+            their_value = theirs.get(key, MISSING)
+            if key == "nodes":
+                value = self._merge_nodes(base_value, our_value, their_value)
+            elif key in CONNECTION_KEYS:
+                value = self._merge_connections(key, base_value, our_value, their_value)
+            else:
+                value = self._merge_value(key, base_value, our_value, their_value)
+            if value is not MISSING:
+                merged[key] = value
+
+        self._drop_dangling_connections(merged)
+        return MergeResult(merged, self.conflicts)
+
+    def _conflict(self, path: str, kind: str, base: Any, ours: Any, theirs: Any) -> Any:
+        resolution = ours if self.prefer == "ours" else theirs
+        self.conflicts.append({
+            "path": path,
+            "kind": kind,
+            "base": None if base is MISSING else base,
+            "ours": None if ours is MISSING else ours,
+            "theirs": None if theirs is MISSING else theirs,
+            "resolution": self.prefer
+        })
+        return copy.deepcopy(resolution)
+
+    def _merge_value(self, path: str, base: Any, ours: Any, theirs: Any) -> Any:
+        """Merge one value; dicts are merged key by key"""
+        if ours == theirs:
+            return copy.deepcopy(ours)
+        if ours == base:
+            return copy.deepcopy(theirs)
+        if theirs == base:
+            return copy.deepcopy(ours)
+
+        if isinstance(ours, dict) and isinstance(theirs, dict):
+            base_dict = base if isinstance(base, dict) else {}
+            merged = {}
+            for key in _union_keys(ours, theirs, base_dict):
+                value = self._merge_value(f"{path}.{key}", base_dict.get(key, MISSING),
+                                          ours.get(key, MISSING), theirs.get(key, MISSING))
+                if value is not MISSING:
+                    merged[key] = value
+            return merged
+
+        kind = MODIFY_DELETE if ours is MISSING or theirs is MISSING else MODIFY_MODIFY
+        return self._conflict(path, kind, base, ours, theirs)
+
+    def _merge_nodes(self, base: Any, ours: Any, theirs: Any) -> Any:
+        if not all(isinstance(nodes, dict) for nodes in (ours, theirs) if nodes is not MISSING):
+            return self._merge_value("nodes", base, ours, theirs)
+        base = base if isinstance(base, dict) else {}
+        ours = ours if isinstance(ours, dict) else {}
+        theirs = theirs if isinstance(theirs, dict) else {}
+
+        merged = {}
+        for node_id in _union_keys(ours, theirs, base):
+            value = self._merge_value(f"nodes.{node_id}", base.get(node_id, MISSING),
+                                      ours.get(node_id, MISSING), theirs.get(node_id, MISSING))
+            if value is not MISSING:
+                merged[node_id] = value
+        return merged
+
+    def _merge_connections(self, key: str, base: Any, ours: Any, theirs: Any) -> Any:
+        if not all(isinstance(connections, list) for connections in (ours, theirs) if connections is not MISSING):
+            return self._merge_value(key, base, ours, theirs)
+        base_by_key = _connections_by_key(base)
+        our_by_key = _connections_by_key(ours)
+        their_by_key = _connections_by_key(theirs)
+
+        merged = []
+        for connection_id in _union_keys(our_by_key, their_by_key, base_by_key):
+            value = self._merge_value(f"{key}[{_format_connection(connection_id)}]",
+                                      base_by_key.get(connection_id, MISSING),
+                                      our_by_key.get(connection_id, MISSING),
+                                      their_by_key.get(connection_id, MISSING))
+            if value is not MISSING:
+                merged.append(value)
+        return merged
+
+    def _drop_dangling_connections(self, merged: Dict[str, Any]):
+        """Remove connections whose node was deleted on the other side"""
+        nodes = merged.get("nodes")
+        if not isinstance(nodes, dict):
+            return
+        for key in CONNECTION_KEYS:
+            connections = merged.get(key)
+            if not isinstance(connections, list):
+                continue
+            kept = []
+            for connection in connections:
+                if isinstance(connection, dict) and (connection.get("sourceNode") not in nodes or
+                                                     connection.get("destNode") not in nodes):
+                    self.conflicts.append({
+                        "path": f"{key}[{_format_connection(connection_key(connection))}]",
+                        "kind": DANGLING,
+                        "base": None,
+                        "ours": None,
+                        "theirs": None,
+                        "resolution": "removed"
+                    })
+                    continue
+                kept.append(connection)
+            merged[key] = kept
+
+def _union_keys(ours: Any, theirs: Any, base: Any) -> List[Any]:
+    """Keys in our order, then keys only theirs has, then keys only the base has"""
+    keys = dict.fromkeys(ours if isinstance(ours, dict) else ())
+    keys.update(dict.fromkeys(theirs if isinstance(theirs, dict) else ()))
+    keys.update(dict.fromkeys(base if isinstance(base, dict) else ()))
+    return list(keys)
+
+def _connections_by_key(connections: Any) -> Dict[Tuple, Any]:
+    if not isinstance(connections, list):
+        return {}
+    by_key = {}
+    for index, connection in enumerate(connections):
+        key = connection_key(connection) if isinstance(connection, dict) else ("#", index)
+        by_key.setdefault(key, connection)
+    return by_key
+
+def _format_connection(key: Tuple) -> str:
+    return f"{key[0]}.{key[1]} -> {key[2]}.{key[3]}" if len(key) == 4 else f"#{key[1]}"
+
+def merge_graphs(base: Optional[Dict[str, Any]], ours: Dict[str, Any], theirs: Dict[str, Any],
+                 prefer: str = "ours") -> MergeResult:
+    """Three-way merge of two edited versions of a graph"""
+    return GraphMerger(prefer).merge(base, ours, theirs)
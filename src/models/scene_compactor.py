@@ -0,0 +1,186 @@
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from src.models.category_tree import is_blueprint_id
+from src.utils.id_remapper import IdRemapper
+
+CONNECTION_KEYS = ("dataConnections", "flowConnections")
+
+class CompactionPlan:
+    """Compacted scene contents and what compaction removes, computed without changing the scene.
+
+    Unchanged graphs and hierarchy nodes are shared with the scene, so a plan
+    costs little more than the parts it rewrites.
+    """
+
+    def __init__(self, source_graphs: List[Dict[str, Any]], source_hierarchy: Any):
+        self.source_graphs = source_graphs  # Scene graphs and hierarchy when planned
+        self.source_hierarchy = source_hierarchy
+        # Category edits change the hierarchy in place, so its content is compared too
+        self.source_hierarchy_content = _hierarchy_content(source_hierarchy)
+        self.graphs: List[Dict[str, Any]] = []
+        self.graph_hierarchy: Optional[Dict[str, Any]] = None
+        self.orphan_entries = 0
+        self.empty_groups = 0
+        self.dangling_connections = 0
+        self.duplicate_ids = 0  # Graphs given new IDs because an earlier graph used theirs
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.parse_seconds_before = 0.0
+        self.parse_seconds_after = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def removed_count(self) -> int:
+        return self.orphan_entries + self.empty_groups + self.dangling_connections
+
+    def format_report(self) -> str:
+        """Describe the plan for a confirmation dialog"""
+        saved_percent = self.bytes_saved / self.bytes_before * 100 if self.bytes_before else 0
+        parse_saved = self.parse_seconds_before - self.parse_seconds_after
+        return "\n".join([
+            f"Orphan hierarchy entries: {self.orphan_entries}",
+            f"Empty category groups: {self.empty_groups}",
+            f"Connections to missing nodes: {self.dangling_connections}",
+            f"Duplicate blueprint IDs regenerated: {self.duplicate_ids}",
+            "",
+            f"Size: {self.bytes_before / 1024:.1f} KB → {self.bytes_after / 1024:.1f} KB "
+            f"({saved_percent:.0f}% smaller)",
+            f"Parse time: {self.parse_seconds_before * 1000:.1f} ms → {self.parse_seconds_after * 1000:.1f} ms "
+            f"({parse_saved * 1000:.1f} ms saved)"
+        ])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "orphan_entries": self.orphan_entries,
+            "empty_groups": self.empty_groups,
+            "dangling_connections": self.dangling_connections,
+            "duplicate_ids": self.duplicate_ids,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "parse_seconds_before": self.parse_seconds_before,
+            "parse_seconds_after": self.parse_seconds_after
+        }
+
+def _hierarchy_content(hierarchy: Any) -> str:
+    return json.dumps(hierarchy, separators=(",", ":"), ensure_ascii=False)
+
+def _prune_connections(graph: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Get the graph without connections to missing nodes, and how many were dropped"""
+    nodes = graph.get("nodes")
+    if not isinstance(nodes, dict):
+        return graph, 0
+
+    pruned = None
+    dropped = 0
+    for key in CONNECTION_KEYS:
+        connections = graph.get(key)
+        if not isinstance(connections, list):
+            continue
+        kept = [connection for connection in connections
+                if not isinstance(connection, dict) or
+                (connection.get("sourceNode") in nodes and connection.get("destNode") in nodes)]
+        if len(kept) != len(connections):
+            if pruned is None:
+                pruned = dict(graph)
+            pruned[key] = kept
+            dropped += len(connections) - len(kept)
+    return (pruned if pruned is not None else graph), dropped
+
+def _prune_hierarchy(node: Dict[str, Any], graph_ids: set, plan: CompactionPlan, is_root: bool) -> Optional[Dict[str, Any]]:
+    """Get a hierarchy node without orphan blueprint entries and empty groups; None if nothing is left"""
+    children = node.get("children")
+    key = node.get("key", "")
+
+    if not children:
+        if is_root:
+            return node
+        if key and is_blueprint_id(key):
+            if key in graph_ids:
+                return node
+            plan.orphan_entries += 1
+        else:
+            plan.empty_groups += 1
+        return None
+
+    kept = []
+    for child in children:
+        if not isinstance(child, dict):
+            plan.orphan_entries += 1
+            continue
+        pruned = _prune_hierarchy(child, graph_ids, plan, False)
+        if pruned is not None:
+            kept.append(pruned)
+
+    if not kept and not is_root:
+        plan.empty_groups += 1
+        return None
+    if len(kept) == len(children) and all(new is old for new, old in zip(kept, children)):
+        return node
+    return dict(node, children=kept)
+
+def _serialize(data: Dict[str, Any], compact: bool) -> bytes:
+    if compact:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+def _parse_seconds(raw: bytes) -> float:
+    start = time.perf_counter()
+    json.loads(raw)
+    return time.perf_counter() - start
+
+def plan_compaction(data: Dict[str, Any], currently_compact: bool = False, measure: bool = True) -> CompactionPlan:
+    """Find garbage and duplicate graph IDs in a scene in one pass and measure the compacted file"""
+    graphs = data.get("graphs", [])
+    plan = CompactionPlan(list(graphs), data.get("graphHierarchy"))
+
+    seen_ids = set()
+    for graph in graphs:
+        pruned, dropped = _prune_connections(graph) if isinstance(graph, dict) else (graph, 0)
+        if isinstance(graph, dict):
+            if graph.get("id") in seen_ids:
+                # Later copies get new IDs so every blueprint can be selected; they show as uncategorized
+                pruned = IdRemapper.for_graphs([pruned]).remap(pruned)
+                plan.duplicate_ids += 1
+            seen_ids.add(graph.get("id"))
+        plan.graphs.append(pruned)
+        plan.dangling_connections += dropped
+
+    hierarchy = data.get("graphHierarchy")
+    if isinstance(hierarchy, dict):
+        graph_ids = {graph.get("id") for graph in graphs if isinstance(graph, dict)}
+        plan.graph_hierarchy = _prune_hierarchy(hierarchy, graph_ids, plan, True)
+
+    if measure:
+        compacted = _compacted_data(data, plan)
+        before = _serialize(data, currently_compact)
+        after = _serialize(compacted, True)
+        plan.bytes_before = len(before)
+        plan.bytes_after = len(after)
+        plan.parse_seconds_before = _parse_seconds(before)
+        plan.parse_seconds_after = _parse_seconds(after)
+    return plan
+
+def _compacted_data(data: Dict[str, Any], plan: CompactionPlan) -> Dict[str, Any]:
+    compacted = dict(data)
+    if "graphs" in data:
+        compacted["graphs"] = plan.graphs
+    if plan.graph_hierarchy is not None:
+        compacted["graphHierarchy"] = plan.graph_hierarchy
+    return compacted
+
+def apply_compaction(scene, plan: CompactionPlan):
+    """Apply a plan to a scene; it is written without whitespace from then on"""
+    with scene.lock:
+        current_graphs = scene.data.get("graphs", [])
+        if len(current_graphs) != len(plan.source_graphs) or \
+                any(graph is not planned for graph, planned in zip(current_graphs, plan.source_graphs)) or \
+                scene.data.get("graphHierarchy") is not plan.source_hierarchy or \
+                _hierarchy_content(plan.source_hierarchy) != plan.source_hierarchy_content:
+            raise ValueError("The scene changed after the compaction was planned")
+
+        scene.data = _compacted_data(scene.data, plan)
+        scene.compact_json = True
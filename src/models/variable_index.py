@@ -0,0 +1,94 @@
+import json
+from typing import Dict, Any, List, Tuple
+
+# Keys Warudo has used for a variable's name and type
+NAME_KEYS = ("name", "Name", "key", "Key")
+TYPE_KEYS = ("type", "Type", "typeName", "TypeName", "valueType", "ValueType")
+
+def _first_value(definition: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        if key in definition:
+            return definition[key]
+    return None
+
+def _variables_input(graph: Dict[str, Any]) -> Any:
+    """Get the raw Variables value of a graph (a JSON string in saved scenes)"""
+    try:
+        return graph["properties"]["dataInputs"]["Variables"]["value"]
+    except (KeyError, TypeError):
+        return None
+
+def parse_variables(raw: Any) -> List[Dict[str, str]]:
+    """Parse a Variables value into name/type pairs; unreadable values define no variables"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw) if raw.strip() else []
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(raw, list):
+        return []
+
+    variables = []
+    for definition in raw:
+        if not isinstance(definition, dict):
+            continue
+        name = _first_value(definition, NAME_KEYS)
+        if not isinstance(name, str) or not name:
+            continue
+        var_type = _first_value(definition, TYPE_KEYS)
+        variables.append({"name": name, "type": var_type if isinstance(var_type, str) else ""})
+    return variables
+
+class VariableIndex:
+    """Scene-wide index of the variables blueprints define.
+
+    Each graph's Variables value is parsed once and kept until the graph or the
+    value is replaced, so syncing after a change only parses the changed graphs.
+    """
+
+    def __init__(self):
+        # id(graph) -> (graph, raw Variables value, parsed variables)
+        self._parsed: Dict[int, Tuple[Dict[str, Any], Any, List[Dict[str, str]]]] = {}
+        self.by_name: Dict[str, List[Tuple[Dict[str, Any], Dict[str, str]]]] = {}  # Name -> [(graph, variable)]
+        self.by_id: Dict[str, List[Dict[str, str]]] = {}  # Blueprint ID -> variables
+
+    def sync(self, graphs: List[Dict[str, Any]]):
+        """Bring the index up to date with the scene's graphs"""
+        parsed = {}
+        changed = len(graphs) != len(self._parsed)
+        for graph in graphs:
+            raw = _variables_input(graph)
+            cached = self._parsed.get(id(graph))
+            if cached is not None and cached[0] is graph and cached[1] is raw:
+                parsed[id(graph)] = cached
+            else:
+                parsed[id(graph)] = (graph, raw, parse_variables(raw))
+                changed = True
+        if not changed and self.by_id.keys() == {graph.get("id") for graph in graphs}:
+            return
+
+        self._parsed = parsed
+        self.by_name = {}
+        self.by_id = {}
+        for graph, _raw, variables in parsed.values():
+            self.by_id.setdefault(graph.get("id"), []).extend(variables)
+            for variable in variables:
+                self.by_name.setdefault(variable["name"], []).append((graph, variable))
+
+    def variables_of(self, graph: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Get the variables a graph defines"""
+        cached = self._parsed.get(id(graph))
+        if cached is not None and cached[0] is graph:
+            return cached[2]
+        return parse_variables(_variables_input(graph))
+
+    def count(self, bp_id: str) -> int:
+        return len(self.by_id.get(bp_id, ()))
+
+    def find(self, text: str = "") -> List[Dict[str, Any]]:
+        """Get variables whose name contains text (case-insensitive) with their blueprint"""
+        text = text.lower()
+        return [{"name": name, "type": variable["type"],
+                 "blueprint_id": graph.get("id"), "blueprint_name": graph.get("name")}
+                for name, owners in sorted(self.by_name.items()) if text in name.lower()
+                for graph, variable in owners]
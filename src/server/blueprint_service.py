@@ -0,0 +1,222 @@
+import os
+from typing import Dict, Any, List, Callable
+from src.models.blueprint_data import BlueprintData
+from src.models.blueprint_import import parse_blueprints
+from src.utils.auto_saver import AutoSaver
+
+class ServiceError(Exception):
+    """Error reported to automation clients"""
+
+    def __init__(self, message: str, code: int = -32000):
+        super().__init__(message)
+        self.code = code
+
+class SceneRegistry:
+    """Named scenes kept parsed in memory between automation requests"""
+
+    def __init__(self):
+        self.scenes: Dict[str, BlueprintData] = {}
+        self.savers: Dict[str, AutoSaver] = {}
+        self._owned_savers = set()  # Savers started by the registry itself
+
+    def add(self, name: str, scene: BlueprintData, saver: AutoSaver = None):
+        """Register a scene; without a saver one is started for it"""
+        self.remove(name)
+        if saver is None:
+            saver = AutoSaver(scene)
+            self._owned_savers.add(name)
+        self.scenes[name] = scene
+        self.savers[name] = saver
+
+    def remove(self, name: str):
+        """Unregister a scene, saving pending changes if the registry owns its saver"""
+        saver = self.savers.pop(name, None)
+        self.scenes.pop(name, None)
+        if name in self._owned_savers:
+            self._owned_savers.discard(name)
+            saver.stop()
+
+    def get(self, name: str) -> BlueprintData:
+        scene = self.scenes.get(name)
+        if scene is None:
+            raise ServiceError(f"Scene '{name}' is not open")
+        return scene
+
+    def mark_dirty(self, name: str):
+        saver = self.savers.get(name)
+        if saver:
+            saver.mark_dirty()
+
+    def flush(self, name: str, force: bool = False):
+        saver = self.savers.get(name)
+        if saver:
+            saver.flush(force=force)
+
+    def close_all(self):
+        """Save and unregister every scene"""
+        for name in list(self.scenes):
+            self.remove(name)
+
+class BlueprintService:
+    """Blueprint operations on registered scenes, exposed to automation clients.
+
+    Methods take and return plain JSON values. They are expected to run one at a
+    time on the thread that owns the scenes (the GUI thread when the window is open).
+    """
+
+    def __init__(self, registry: SceneRegistry, on_change: Callable[[str], None] = None):
+        self.registry = registry
+        self.on_change = on_change  # Called with the scene name after a change
+
+    def _changed(self, name: str):
+        self.registry.mark_dirty(name)
+        if self.on_change:
+            self.on_change(name)
+
+    @staticmethod
+    def _summary(bp: Dict[str, Any]) -> Dict[str, Any]:
+        summary = dict(bp)
+        summary["category_path"] = list(summary["category_path"])
+        return summary
+
+    def list_scenes(self) -> List[Dict[str, Any]]:
+        """Get the open scenes"""
+        return [dict(scene.get_scene_info(), scene=name) for name, scene in self.registry.scenes.items()]
+
+    def open_scene(self, path: str, name: str = None) -> Dict[str, Any]:
+        """Load a scene file and keep it open under a name (the file name by default)"""
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        if not os.path.exists(path):
+            raise ServiceError(f"File not found: {path}", -32602)
+        scene = BlueprintData(path)
+        self.registry.add(name, scene)
+        # References to missing nodes or graphs do not stop the scene opening; scenes.compact removes them
+        return dict(scene.get_scene_info(), scene=name, warnings=scene.load_warnings)
+
+    def close_scene(self, scene: str) -> bool:
+        """Save pending changes of a scene and close it"""
+        self.registry.get(scene)
+        self.registry.remove(scene)
+        return True
+
+    def list_blueprints(self, scene: str) -> List[Dict[str, Any]]:
+        """Get the blueprint summaries of a scene"""
+        return [self._summary(bp) for bp in self.registry.get(scene).get_blueprint_list()]
+
+    def search(self, scene: str, text: str = "", category: str = None, limit: int = None,
+               variable: str = None) -> List[Dict[str, Any]]:
+        """Find blueprints whose name or ID contains text, optionally below a category path or defining a matching variable"""
+        text = text.lower()
+        prefix = tuple(category.split("/")) if category else ()
+        scene_data = self.registry.get(scene)
+        with_variable = {match["blueprint_id"] for match in scene_data.find_variables(variable)} \
+            if variable is not None else None
+
+        results = []
+        for bp in scene_data.get_blueprint_list():
+            if text and text not in bp["name"].lower() and text not in bp["id"].lower():
+                continue
+            if bp["category_path"][:len(prefix)] != prefix:
+                continue
+            if with_variable is not None and bp["id"] not in with_variable:
+                continue
+            results.append(self._summary(bp))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def find_variables(self, scene: str, text: str = "") -> List[Dict[str, Any]]:
+        """Get variable definitions whose name contains text, with the blueprint defining them"""
+        return self.registry.get(scene).find_variables(text)
+
+    def get_blueprint(self, scene: str, id: str) -> Dict[str, Any]:
+        """Get the full graph JSON of a blueprint"""
+        graph = self.registry.get(scene).get_blueprint_by_id(id)
+        if graph is None:
+            raise ServiceError(f"Blueprint '{id}' not found in scene '{scene}'", -32602)
+        return graph
+
+    def copy(self, source: str, target: str, ids: List[str], replace: bool = False,
+             keep_id: bool = True, new_names: Dict[str, str] = None, move: bool = False,
+             assets: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Copy (or move) blueprints in one batch.
+
+        Returns {"ok", "id", "name"} per source blueprint ID, with the ID and name
+        the copy has in the target (None if it was not copied).
+        """
+        source_scene = self.registry.get(source)
+        target_scene = self.registry.get(target)
+        if source_scene is target_scene:
+            raise ServiceError("Source and target must be different scenes", -32602)
+
+        plan = source_scene.plan_copy_to_scene(ids, target_scene, new_names, replace, keep_id, assets)
+        source_scene.apply_copy_plan(plan)
+        results = plan.outcomes()
+        copied = [bp_id for bp_id, result in results.items() if result["ok"]]
+        if copied:
+            self._changed(target)
+            if move:
+                for bp_id in copied:
+                    source_scene.remove_blueprint(bp_id)
+                self._changed(source)
+        return results
+
+    def plan_copy(self, source: str, target: str, ids: List[str], replace: bool = False,
+                  keep_id: bool = True, new_names: Dict[str, str] = None, assets: bool = False) -> Dict[str, Any]:
+        """Report what a copy would add, replace, rename or reject without changing anything"""
+        source_scene = self.registry.get(source)
+        target_scene = self.registry.get(target)
+        return source_scene.plan_copy_to_scene(ids, target_scene, new_names, replace, keep_id, assets).to_dict()
+
+    def move(self, source: str, target: str, ids: List[str], replace: bool = False,
+             keep_id: bool = True, new_names: Dict[str, str] = None,
+             assets: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Move blueprints to another scene (referenced assets are copied, not moved)"""
+        return self.copy(source, target, ids, replace, keep_id, new_names, move=True, assets=assets)
+
+    def import_json(self, target: str, text: str, replace: bool = False, keep_id: bool = True,
+                    assets: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Copy the blueprints of blueprint, blueprint list or scene JSON text into a scene, with results as for copy"""
+        target_scene = self.registry.get(target)
+        try:
+            imported = parse_blueprints(text)
+        except ValueError as e:
+            raise ServiceError(str(e), -32602)
+
+        bp_ids = [graph["id"] for graph in imported.data["graphs"]]
+        plan = imported.plan_copy_to_scene(bp_ids, target_scene, None, replace, keep_id, assets)
+        imported.apply_copy_plan(plan)
+        results = plan.outcomes()
+        if any(result["ok"] for result in results.values()):
+            self._changed(target)
+        return results
+
+    def rename(self, scene: str, id: str, name: str) -> bool:
+        """Rename a blueprint"""
+        if not self.registry.get(scene).rename_blueprint(id, name):
+            return False
+        self._changed(scene)
+        return True
+
+    def remove(self, scene: str, ids: List[str]) -> Dict[str, bool]:
+        """Remove blueprints, returning success per blueprint ID"""
+        scene_data = self.registry.get(scene)
+        results = {bp_id: scene_data.remove_blueprint(bp_id) for bp_id in ids}
+        if any(results.values()):
+            self._changed(scene)
+        return results
+
+    def compact(self, scene: str, preview: bool = True) -> Dict[str, Any]:
+        """Report (and unless previewing, remove) hierarchy and connection garbage of a scene"""
+        scene_data = self.registry.get(scene)
+        plan = scene_data.plan_compaction()
+        if not preview:
+            scene_data.apply_compaction(plan)
+            self._changed(scene)
+        return plan.to_dict()
+
+    def save(self, scene: str) -> bool:
+        """Save a scene now instead of waiting for the background save"""
+        self.registry.get(scene)
+        self.registry.flush(scene, force=True)
+        return True
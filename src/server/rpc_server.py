@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import hmac
+import inspect
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+from src.server.blueprint_service import BlueprintService, SceneRegistry, ServiceError
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_SIZE = 256 * 1024 * 1024  # Copies can carry large graphs
+# Generated tokens are written here instead of to the console, where logs and screen captures would keep them
+DEFAULT_TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".warudo_bp_copy", "rpc-token")
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+UNAUTHORIZED = -32001
+
+# Errors after which the connection is closed instead of reading further lines
+FATAL_ERRORS = (PARSE_ERROR, INVALID_REQUEST, UNAUTHORIZED)
+
+# An HTTP request line or Host header: a web page posting to the server
+HTTP_LINE_RE = re.compile(rb'^\s*(?:[A-Z]+ \S+ HTTP/\d|host\s*:)', re.IGNORECASE)
+
+# Method name -> BlueprintService method
+METHODS = {
+    "scenes.list": "list_scenes",
+    "scenes.open": "open_scene",
+    "scenes.close": "close_scene",
+    "blueprints.list": "list_blueprints",
+    "blueprints.search": "search",
+    "blueprints.get": "get_blueprint",
+    "variables.find": "find_variables",
+    "blueprints.plan": "plan_copy",
+    "blueprints.copy": "copy",
+    "blueprints.move": "move",
+    "blueprints.import": "import_json",
+    "blueprints.rename": "rename",
+    "blueprints.remove": "remove",
+    "scenes.compact": "compact",
+    "scenes.save": "save"
+}
+
+# Runs a call on the thread that owns the scenes and returns a future of its result
+Dispatcher = Callable[[Callable[[], Any]], Future]
+
+def _error(request_id, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+def _is_fatal(response: Any) -> bool:
+    """Check if a response reports a malformed request, alone or in a batch"""
+    responses = response if isinstance(response, list) else [response]
+    return any(isinstance(item, dict) and item.get("error", {}).get("code") in FATAL_ERRORS
+               for item in responses)
+
+def generate_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def write_token_file(token: str, path: str = DEFAULT_TOKEN_PATH) -> str:
+    """Write a token to a file only the current user can read, returning its path"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + ".tmp"
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+    # Created with user-only permissions, so the token is never readable by others
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    os.replace(temp_path, path)
+    return path
+
+class RpcServer:
+    """Newline-delimited JSON-RPC 2.0 server for scripted blueprint operations.
+
+    Listens on localhost or a Unix socket. Every call is handed to the dispatcher
+    so scene access stays on a single thread while the event loop keeps serving
+    other clients.
+
+    When a token is set, the first request of a connection must be
+    {"method": "auth", "params": {"token": ...}}. TCP always needs one, since any
+    local process or web page can reach a localhost port. A malformed line,
+    an HTTP request or a failed auth closes the connection.
+    """
+
+    def __init__(self, service: BlueprintService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 unix_path: str = None, dispatcher: Dispatcher = None, token: str = None):
+        if token is None and not unix_path:
+            raise ValueError("A token is required to listen on TCP")
+        self.service = service
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.token = token
+        self._executor = None
+        if dispatcher is None:
+            # Headless: one worker thread owns the scenes
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BlueprintService")
+            dispatcher = lambda call: self._executor.submit(call)
+        self.dispatcher = dispatcher
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def address(self) -> str:
+        return self.unix_path or f"{self.host}:{self.port}"
+
+    async def start(self):
+        """Start listening"""
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle_client, self.unix_path,
+                                                           limit=MAX_REQUEST_SIZE)
+            # Only the user running the server may connect
+            os.chmod(self.unix_path, 0o600)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                      limit=MAX_REQUEST_SIZE)
+            # Report the real port if an ephemeral one was requested
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        """Run the event loop in a daemon thread; returns once the server is listening"""
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                self._ready.set()
+                return
+            self._ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="RpcServer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self):
+        """Stop a server started with start_in_thread"""
+        if self._loop and self._server:
+            async def shutdown():
+                self._server.close()
+                await self._server.wait_closed()
+                self._loop.stop()
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+            self._thread.join(timeout=5)
+        if self._executor:
+            self._executor.shutdown(wait=True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        authenticated = self.token is None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than the stream limit
+                    writer.write(json.dumps(_error(None, INVALID_REQUEST, "Request too large")).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if HTTP_LINE_RE.match(line):
+                    # Do not answer: the body of an HTTP request must never be run
+                    break
+
+                if authenticated:
+                    response = await self.handle_message(line)
+                else:
+                    response = self.authenticate(line)
+                    authenticated = "result" in response
+                if response is not None:
+                    writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    await writer.drain()
+                if _is_fatal(response):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def authenticate(self, line: bytes) -> Dict[str, Any]:
+        """Check the auth request that must open a connection when a token is set"""
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or request.get("method") != "auth":
+            return _error(request.get("id") if isinstance(request, dict) else None,
+                          UNAUTHORIZED, "The first request must be auth")
+
+        params = request.get("params")
+        token = params.get("token") if isinstance(params, dict) else \
+            params[0] if isinstance(params, list) and params else None
+        if not isinstance(token, str) or not hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            return _error(request.get("id"), UNAUTHORIZED, "Invalid token")
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": True}
+
+    async def handle_message(self, line: bytes):
+        """Handle one request or batch; returns the response, or None for notifications only"""
+        try:
+            message = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return _error(None, PARSE_ERROR, f"Parse error: {e}")
+
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch")
+            responses = [await self._handle_request(request) for request in message]
+            responses = [response for response in responses if response is not None]
+            return responses or None
+        return await self._handle_request(message)
+
+    async def _handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or \
+                not isinstance(request.get("method"), str):
+            return _error(request.get("id") if isinstance(request, dict) else None,
+                          INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        method_name = METHODS.get(request["method"])
+        if method_name is None:
+            response = _error(request_id, METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            return None if is_notification else response
+
+        params = request.get("params", {})
+        if isinstance(params, list):
+            args, kwargs = params, {}
+        elif isinstance(params, dict):
+            args, kwargs = [], params
+        else:
+            return None if is_notification else _error(request_id, INVALID_PARAMS, "params must be an object or array")
+
+        method = getattr(self.service, method_name)
+        try:
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            return None if is_notification else _error(request_id, INVALID_PARAMS, f"Invalid params: {e}")
+
+        try:
+            result = await asyncio.wrap_future(self.dispatcher(lambda: method(*args, **kwargs)))
+        except ServiceError as e:
+            response = _error(request_id, e.code, str(e))
+        except Exception as e:
+            response = _error(request_id, -32000, f"{type(e).__name__}: {e}")
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        return None if is_notification else response
+
+def main(argv=None) -> int:
+    """Run a headless server that keeps the given scenes open"""
+    parser = argparse.ArgumentParser(description="Blueprint automation server (JSON-RPC 2.0 over newline-delimited JSON)")
+    parser.add_argument("scenes", nargs="*", help="scene files to open, named after the file")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", dest="unix_path", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--token", help="token clients must send with auth (generated for TCP if not given)")
+    parser.add_argument("--token-file", default=DEFAULT_TOKEN_PATH, help="where a generated token is written")
+    args = parser.parse_args(argv)
+    token = args.token or (None if args.unix_path else generate_token())
+
+    registry = SceneRegistry()
+    service = BlueprintService(registry)
+    for path in args.scenes:
+        info = service.open_scene(path)
+        print(f"Opened {info['scene']}: {info['blueprint_count']} blueprints")
+
+    server = RpcServer(service, args.host, args.port, args.unix_path, token=token)
+
+    async def serve():
+        await server.start()
+        print(f"Listening on {server.address}")
+        if token and not args.token:
+            print(f"Token written to {write_token_file(token, args.token_file)}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Scene access belongs to the worker thread
+        server.dispatcher(registry.close_all).result()
+        server.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
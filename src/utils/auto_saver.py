@@ -0,0 +1,101 @@
+import threading
+import time
+from typing import Optional
+
+DEFAULT_SAVE_DELAY = 1.5  # Seconds without changes before a save starts
+
+class AutoSaver:
+    """Write-behind saver that coalesces bursts of scene changes into one background save"""
+
+    def __init__(self, scene, delay: float = DEFAULT_SAVE_DELAY):
+        self.scene = scene
+        self.delay = delay
+        self.last_error: Optional[Exception] = None
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._saving = False
+        self._stopped = False
+        self._last_change = 0.0
+        self._thread = threading.Thread(target=self._run, name="AutoSaver", daemon=True)
+        self._thread.start()
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    @property
+    def is_saving(self) -> bool:
+        return self._saving
+
+    def mark_dirty(self):
+        """Record a change; the save is delayed until changes stop for a while"""
+        with self._condition:
+            self._dirty = True
+            self._last_change = time.monotonic()
+            self._condition.notify_all()
+
+    def flush(self, force: bool = False):
+        """Save pending changes now on the calling thread (always saves if force is set)"""
+        with self._condition:
+            # Wait for a background save to finish first
+            while self._saving:
+                self._condition.wait()
+            if not self._dirty and not force:
+                return
+            self._dirty = False
+            self._saving = True
+
+        self._save(raise_errors=True)
+
+    def stop(self):
+        """Flush pending changes and stop the background thread"""
+        self.flush()
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout=5)
+
+    def take_error(self) -> Optional[Exception]:
+        """Get and clear the last background save error"""
+        error, self.last_error = self.last_error, None
+        return error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and not self._dirty:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+                # Debounce: wait until no change arrived for `delay` seconds
+                remaining = self._last_change + self.delay - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                if self._saving:
+                    self._condition.wait()
+                    continue
+                if not self._dirty:
+                    continue
+
+                self._dirty = False
+                self._saving = True
+
+            self._save()
+
+    def _save(self, raise_errors: bool = False):
+        try:
+            self.scene.save()
+        except Exception as e:
+            # Keep the changes marked unsaved so they are retried
+            with self._condition:
+                self._dirty = True
+                self._last_change = time.monotonic()
+            if raise_errors:
+                raise
+            self.last_error = e
+        finally:
+            with self._condition:
+                self._saving = False
+                self._condition.notify_all()
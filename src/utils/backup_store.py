@@ -0,0 +1,254 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+DEFAULT_MAX_VERSIONS = 30
+MANIFEST_NAME = "manifest.json"
+
+def _hash_value(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def _graph_keys(graphs: List[Dict[str, Any]]) -> List[str]:
+    """Get a key per graph that is unique within one version.
+
+    A graph is keyed by its ID; repeated IDs get "<id>#<n>" for their n-th
+    occurrence and graphs without an ID "#<index>", so no graph is lost when
+    a scene holds duplicates.
+    """
+    keys = []
+    used = set()
+    for index, graph in enumerate(graphs):
+        graph_id = graph.get("id")
+        key = graph_id or f"#{index}"
+        occurrence = 1
+        while key in used:
+            occurrence += 1
+            key = f"{graph_id}#{occurrence}"
+        used.add(key)
+        keys.append(key)
+    return keys
+
+class BackupStore:
+    """Backup history of a scene: a compressed base snapshot plus per-save deltas.
+
+    Deltas are taken at graph granularity: each one stores only the graphs that
+    were added or changed, the keys of removed graphs, and changed top-level
+    fields, so a version costs roughly the size of what changed.
+    """
+
+    def __init__(self, backup_dir: str, max_versions: int = DEFAULT_MAX_VERSIONS, scene_path: str = None):
+        self.backup_dir = backup_dir
+        self.scene_path = scene_path
+        self.max_versions = max_versions
+        self.manifest = self._load_manifest()
+        self._obsolete_files = []
+
+    @classmethod
+    def for_scene(cls, scene_path: str, max_versions: int = DEFAULT_MAX_VERSIONS) -> 'BackupStore':
+        """Get the backup store kept beside a scene file"""
+        scene_path = os.path.abspath(scene_path)
+        directory, file_name = os.path.split(scene_path)
+        return cls(os.path.join(directory, f".{file_name}.backups"), max_versions, scene_path)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        manifest_path = os.path.join(self.backup_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"versions": [], "next_version": 1, "state": None, "file_stat": None}
+
+    def _save_manifest(self):
+        manifest_path = os.path.join(self.backup_dir, MANIFEST_NAME)
+        temp_path = manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(temp_path, manifest_path)
+
+    def _write_blob(self, file_name: str, payload: Dict[str, Any]) -> int:
+        blob_path = os.path.join(self.backup_dir, file_name)
+        raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        with gzip.open(blob_path, 'wb', compresslevel=6) as f:
+            f.write(raw)
+        return os.path.getsize(blob_path)
+
+    def _read_blob(self, file_name: str) -> Dict[str, Any]:
+        with gzip.open(os.path.join(self.backup_dir, file_name), 'rb') as f:
+            return json.loads(f.read())
+
+    @staticmethod
+    def _snapshot_state(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Hash every graph and every other top-level field"""
+        graphs = data.get("graphs", [])
+        order = _graph_keys(graphs)
+        return {
+            "graphs": {key: _hash_value(graph) for key, graph in zip(order, graphs)},
+            "order": order,
+            "fields": {key: _hash_value(value) for key, value in data.items() if key != "graphs"}
+        }
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Get recorded versions, oldest first"""
+        return list(self.manifest["versions"])
+
+    def record(self, data: Dict[str, Any], scene_path: str = None) -> Optional[int]:
+        """Record a version of the scene before it is saved; returns the new version number.
+
+        If the file on disk changed since the last recorded save (or nothing has
+        been recorded yet), its current contents are recorded first so that the
+        version being overwritten is never lost.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+
+        if scene_path and os.path.exists(scene_path):
+            stat = os.stat(scene_path)
+            if self.manifest["file_stat"] != [stat.st_mtime, stat.st_size]:
+                with open(scene_path, 'r', encoding='utf-8') as f:
+                    on_disk = json.load(f)
+                self._record_version(on_disk, "on disk")
+
+        version = self._record_version(data, "saved")
+        self._apply_retention()
+        self._save_manifest()
+
+        # Delete folded versions only once the manifest no longer references them
+        for file_name in self._obsolete_files:
+            try:
+                os.remove(os.path.join(self.backup_dir, file_name))
+            except OSError:
+                pass
+        self._obsolete_files = []
+        return version
+
+    def mark_saved(self, scene_path: str):
+        """Remember the state of the scene file after it was written"""
+        stat = os.stat(scene_path)
+        self.manifest["file_stat"] = [stat.st_mtime, stat.st_size]
+        self._save_manifest()
+
+    def _record_version(self, data: Dict[str, Any], source: str) -> Optional[int]:
+        state = self._snapshot_state(data)
+        previous = self.manifest["state"]
+        if previous == state:
+            return None  # Nothing changed since the last version
+
+        version = self.manifest["next_version"]
+        self.manifest["next_version"] += 1
+        entry = {"version": version, "timestamp": time.time(), "source": source}
+
+        if previous is None:
+            entry["type"] = "base"
+            entry["file"] = f"base-{version:06d}.json.gz"
+            entry["size"] = self._write_blob(entry["file"], data)
+        else:
+            delta = self._make_delta(data, state, previous)
+            entry["type"] = "delta"
+            entry["file"] = f"delta-{version:06d}.json.gz"
+            entry["size"] = self._write_blob(entry["file"], delta)
+            entry["changed"] = len(delta["graphs"])
+            entry["removed"] = len(delta["removed"])
+
+        self.manifest["versions"].append(entry)
+        self.manifest["state"] = state
+        return version
+
+    @staticmethod
+    def _make_delta(data: Dict[str, Any], state: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, Any]:
+        old_hashes = previous["graphs"]
+        graphs = data.get("graphs", [])
+        changed = {key: graphs[index] for index, key in enumerate(state["order"])
+                   if old_hashes.get(key) != state["graphs"][key]}
+        removed = [key for key in old_hashes if key not in state["graphs"]]
+
+        old_fields = previous["fields"]
+        fields = {key: data[key] for key, value_hash in state["fields"].items()
+                  if old_fields.get(key) != value_hash}
+        removed_fields = [key for key in old_fields if key not in state["fields"]]
+
+        return {
+            "graphs": changed,
+            "removed": removed,
+            "order": state["order"] if state["order"] != previous["order"] else None,
+            "fields": fields,
+            "removed_fields": removed_fields,
+            "field_order": [key for key in data]
+        }
+
+    @staticmethod
+    def _apply_delta(graphs: Dict[str, Any], order: List[str], fields: Dict[str, Any],
+                     delta: Dict[str, Any]) -> List[str]:
+        for key in delta["removed"]:
+            graphs.pop(key, None)
+        graphs.update(delta["graphs"])
+
+        for key in delta["removed_fields"]:
+            fields.pop(key, None)
+        fields.update(delta["fields"])
+
+        if delta["order"] is not None:
+            return delta["order"]
+        # Order unchanged: graphs keep their positions
+        return order
+
+    def restore(self, version: int) -> Dict[str, Any]:
+        """Rebuild the scene data of a recorded version"""
+        versions = self.manifest["versions"]
+        if not any(entry["version"] == version for entry in versions):
+            raise ValueError(f"Backup version {version} not found")
+
+        graphs, order, fields, field_order = {}, [], {}, []
+        for entry in versions:
+            blob = self._read_blob(entry["file"])
+            if entry["type"] == "base":
+                field_order = list(blob)
+                graph_list = blob.get("graphs", [])
+                order = _graph_keys(graph_list)
+                graphs = dict(zip(order, graph_list))
+                fields = {key: value for key, value in blob.items() if key != "graphs"}
+            else:
+                order = self._apply_delta(graphs, order, fields, blob)
+                field_order = blob["field_order"]
+
+            if entry["version"] == version:
+                break
+
+        data = {}
+        for key in field_order:
+            if key == "graphs":
+                data["graphs"] = [graphs[graph_key] for graph_key in order]
+            elif key in fields:
+                data[key] = fields[key]
+        return data
+
+    def _apply_retention(self):
+        """Drop the oldest versions beyond the limit by folding them into a new base.
+
+        Rebuilding and writing a base costs about as much as saving the scene, so
+        versions are folded in batches of half the limit rather than on every save.
+        """
+        versions = self.manifest["versions"]
+        excess = len(versions) - self.max_versions
+        if excess < max(1, self.max_versions // 2):
+            return
+
+        new_base = versions[excess]
+        data = self.restore(new_base["version"])
+        old_entries = versions[:excess + 1]
+
+        new_base = dict(new_base)
+        new_base["type"] = "base"
+        new_base["file"] = f"base-{new_base['version']:06d}.json.gz"
+        new_base["size"] = self._write_blob(new_base["file"], data)
+        new_base.pop("changed", None)
+        new_base.pop("removed", None)
+
+        self.manifest["versions"] = [new_base] + versions[excess + 1:]
+        self._obsolete_files.extend(entry["file"] for entry in old_entries 
+                                    if entry["file"] != new_base["file"])
+
+    def get_total_size(self) -> int:
+        """Get the compressed size of all stored versions"""
+        return sum(entry["size"] for entry in self.manifest["versions"])
@@ -0,0 +1,70 @@
+import re
+import uuid
+from typing import Dict, Any, Iterable
+
+# UUID pattern used to find IDs embedded in longer strings (e.g. serialized variables)
+UUID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+UUID_LENGTH = 36
+
+class IdRemapper:
+    """Regenerate blueprint, node and connection IDs and rewrite every reference to them"""
+
+    def __init__(self, id_map: Dict[str, str] = None):
+        self.id_map = id_map if id_map is not None else {}
+
+    @classmethod
+    def for_graphs(cls, graphs: Iterable[Dict[str, Any]]) -> 'IdRemapper':
+        """Create a remapper with new IDs for every ID defined by a batch of graphs"""
+        remapper = cls()
+        for graph in graphs:
+            remapper.collect_graph_ids(graph)
+        return remapper
+
+    def add_id(self, old_id: str):
+        """Assign a new ID to an old one, once"""
+        if old_id and isinstance(old_id, str) and old_id not in self.id_map:
+            self.id_map[old_id] = str(uuid.uuid4())
+
+    def collect_graph_ids(self, graph: Dict[str, Any]):
+        """Assign new IDs to a graph, its nodes and its connections"""
+        self.add_id(graph.get("id"))
+
+        nodes = graph.get("nodes") or {}
+        for node_id, node in nodes.items():
+            self.add_id(node_id)
+            if isinstance(node, dict):
+                self.add_id(node.get("id"))
+
+        for key in ("dataConnections", "flowConnections"):
+            for connection in graph.get(key) or []:
+                if isinstance(connection, dict):
+                    self.add_id(connection.get("id"))
+
+    def remap(self, obj: Any) -> Any:
+        """Return a deep copy of obj with all known IDs replaced, in a single traversal"""
+        get = self.id_map.get
+        sub = UUID_PATTERN.sub
+
+        def replace_match(match):
+            found = match.group(0)
+            return get(found, found)
+
+        def walk(value):
+            value_type = type(value)
+            if value_type is str:
+                if len(value) < UUID_LENGTH:
+                    return value
+                new_value = get(value)
+                if new_value is not None:
+                    return new_value
+                if len(value) > UUID_LENGTH:
+                    # IDs can also be embedded in serialized values
+                    return sub(replace_match, value)
+                return value
+            if value_type is dict:
+                return {get(key, key): walk(item) for key, item in value.items()}
+            if value_type is list:
+                return [walk(item) for item in value]
+            return value
+
+        return walk(obj)
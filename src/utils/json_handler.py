@@ -1,39 +1,72 @@
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
+from src.utils.scene_validator import SceneValidationError, StreamingSceneValidator
 
 class JsonHandler:
     @staticmethod
-    def load_json(file_path: str) -> Dict[str, Any]:
+    def load_json(file_path: str, object_hook=None) -> Dict[str, Any]:
         """Load JSON data from file"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                return json.load(f, object_hook=object_hook)
         except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
+        except SceneValidationError as e:
+            raise ValueError(f"Invalid Warudo scene in file {file_path}: {e}") from e
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON format in file {file_path}: {e}")
         except Exception as e:
             raise RuntimeError(f"Error loading JSON file {file_path}: {e}")
     
     @staticmethod
-    def save_json(file_path: str, data: Dict[str, Any]) -> None:
-        """Save JSON data to file"""
+    def save_json(file_path: str, data: Dict[str, Any], compact: bool = False) -> None:
+        """Save JSON data to file, without whitespace if compact is set"""
         try:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                if compact:
+                    json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+                else:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
         except Exception as e:
             raise RuntimeError(f"Error saving JSON file {file_path}: {e}")
     
+    @staticmethod
+    def is_compact_file(file_path: str) -> bool:
+        """Check if a JSON file was written without indentation"""
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(64).lstrip(b"\xef\xbb\xbf \t")
+        except OSError:
+            return False
+        return head.startswith(b"{") and not head[1:].lstrip(b" \t").startswith((b"\n", b"\r"))
+    
     @staticmethod
     def validate_warudo_scene(data: Dict[str, Any]) -> bool:
         """Validate if the JSON data is a valid Warudo scene"""
         required_fields = ['name', 'appVersion', 'graphs']
         return all(field in data for field in required_fields)
     
+    @staticmethod
+    def load_scene(file_path: str, warnings: List[str] = None) -> Dict[str, Any]:
+        """Load a Warudo scene file, validating graphs while they are parsed.
+
+        Structural problems raise ValueError; duplicate graph IDs and references to
+        missing nodes or graphs are appended to warnings so the scene still opens.
+        """
+        validator = StreamingSceneValidator()
+        data = JsonHandler.load_json(file_path, object_hook=validator)
+        try:
+            validator.finish(data)
+        except SceneValidationError as e:
+            raise ValueError(f"Invalid Warudo scene in file {file_path}: {e}") from e
+        if warnings is not None:
+            warnings.extend(validator.warnings)
+        return data
+    
     @staticmethod
     def format_json_string(data: Dict[str, Any]) -> str:
         """Format JSON data as a readable string"""
@@ -0,0 +1,198 @@
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+# Expected types of Warudo 0.13.1 scene and graph fields
+SCENE_FIELDS = {"name": str, "appVersion": str, "graphs": list, "assets": list,
+                "graphHierarchy": dict, "assetHierarchy": dict}
+REQUIRED_SCENE_FIELDS = ("name", "appVersion", "graphs")
+GRAPH_FIELDS = {"id": str, "name": str, "enabled": bool, "order": int, "nodes": dict,
+                "dataConnections": list, "flowConnections": list, "properties": dict}
+REQUIRED_GRAPH_FIELDS = ("id", "name")
+CONNECTION_ENDPOINTS = ("sourceNode", "destNode")
+
+class SceneValidationError(ValueError):
+    """Raised when a scene does not match the expected Warudo scene shape"""
+
+    def __init__(self, location: str, message: str):
+        super().__init__(f"{location}: {message}")
+        self.location = location
+        self.message = message
+
+def _type_name(expected) -> str:
+    return expected.__name__
+
+def _check_graph(graph: Any, location: str) -> Optional[Tuple[str, str]]:
+    """Check the structure of a single graph, returning (location, message) of the first problem"""
+    if not isinstance(graph, dict):
+        return location, "graph must be an object"
+
+    for field in REQUIRED_GRAPH_FIELDS:
+        if field not in graph:
+            return location, f"missing required field '{field}'"
+
+    for field, expected in GRAPH_FIELDS.items():
+        value = graph.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            return f"{location}.{field}", f"expected {_type_name(expected)}, got {type(value).__name__}"
+
+    nodes = graph.get("nodes") or {}
+    for node_id, node in nodes.items():
+        if not isinstance(node, dict):
+            return f"{location}.nodes[{node_id!r}]", "node must be an object"
+
+    for key in ("dataConnections", "flowConnections"):
+        for index, connection in enumerate(graph.get(key) or []):
+            connection_location = f"{location}.{key}[{index}]"
+            if not isinstance(connection, dict):
+                return connection_location, "connection must be an object"
+
+    return None
+
+def _check_graph_references(graph: Dict[str, Any], location: str) -> List[str]:
+    """Get warnings for connections of a structurally valid graph that reference missing nodes"""
+    nodes = graph.get("nodes") or {}
+    warnings = []
+    for key in ("dataConnections", "flowConnections"):
+        for index, connection in enumerate(graph.get(key) or []):
+            for endpoint in CONNECTION_ENDPOINTS:
+                node_id = connection.get(endpoint)
+                if node_id is not None and node_id not in nodes:
+                    warnings.append(f"{location}.{key}[{index}].{endpoint}: references unknown node '{node_id}'")
+    return warnings
+
+def _duplicate_id_warning(location: str, graph_id: str) -> str:
+    return f"{location}.id: duplicate graph id '{graph_id}'"
+
+def graph_location(index: int, graph: Any) -> str:
+    """Describe where a graph is in a scene for messages, e.g. graphs[3] ('Name')"""
+    name = graph.get("name") if isinstance(graph, dict) else None
+    return f"graphs[{index}] ({name!r})" if name else f"graphs[{index}]"
+
+class SceneValidator:
+    """Deep validation of Warudo 0.13.1 scene data"""
+
+    @staticmethod
+    def validate_graph(graph: Any, location: str = "graph") -> None:
+        """Validate a single graph, raising SceneValidationError on the first problem"""
+        problem = _check_graph(graph, location)
+        if problem:
+            raise SceneValidationError(*problem)
+
+    @staticmethod
+    def validate_scene_fields(data: Any) -> None:
+        """Validate the top-level scene fields"""
+        if not isinstance(data, dict):
+            raise SceneValidationError("$", "scene must be an object")
+
+        for field in REQUIRED_SCENE_FIELDS:
+            if field not in data:
+                raise SceneValidationError("$", f"missing required field '{field}'")
+
+        for field, expected in SCENE_FIELDS.items():
+            value = data.get(field)
+            if value is not None and not isinstance(value, expected):
+                raise SceneValidationError(field, f"expected {_type_name(expected)}, got {type(value).__name__}")
+
+    @staticmethod
+    def validate_hierarchy(hierarchy: Any, graph_ids: set, location: str = "graphHierarchy") -> List[str]:
+        """Validate the hierarchy shape, returning warnings for blueprint keys without a graph"""
+        warnings = []
+        if hierarchy is None:
+            return warnings
+
+        stack = [(hierarchy, location)]
+        while stack:
+            node, node_location = stack.pop()
+            if not isinstance(node, dict):
+                raise SceneValidationError(node_location, "hierarchy entry must be an object")
+
+            key = node.get("key", "")
+            children = node.get("children")
+            if not isinstance(key, str):
+                raise SceneValidationError(f"{node_location}.key", "expected str")
+            if children is not None and not isinstance(children, list):
+                raise SceneValidationError(f"{node_location}.children", "expected list or null")
+
+            if children:
+                for index in range(len(children) - 1, -1, -1):
+                    stack.append((children[index], f"{node_location}.children[{index}]"))
+            elif key and UUID_RE.match(key) and key not in graph_ids:
+                warnings.append(f"{node_location}.key: references unknown graph '{key}'")
+        return warnings
+
+    @staticmethod
+    def find_reference_problems(graphs: List[Dict[str, Any]]) -> List[str]:
+        """Get warnings for connections to missing nodes in structurally valid graphs"""
+        warnings = []
+        for index, graph in enumerate(graphs):
+            warnings.extend(_check_graph_references(graph, graph_location(index, graph)))
+        return warnings
+
+    @staticmethod
+    def find_duplicate_ids(graphs: List[Any]) -> List[str]:
+        """Get warnings for graphs whose ID an earlier graph already uses"""
+        graph_ids = set()
+        warnings = []
+        for index, graph in enumerate(graphs):
+            graph_id = graph.get("id") if isinstance(graph, dict) else None
+            if graph_id in graph_ids:
+                warnings.append(_duplicate_id_warning(graph_location(index, graph), graph_id))
+            graph_ids.add(graph_id)
+        return warnings
+
+    @classmethod
+    def validate(cls, data: Any) -> List[str]:
+        """Validate a parsed scene.
+
+        Structural problems raise SceneValidationError. Duplicate graph IDs and
+        references to missing nodes or graphs are returned as warnings, since
+        compaction repairs them and the rest of the scene stays usable.
+        """
+        cls.validate_scene_fields(data)
+        graphs = data["graphs"]
+
+        for index, graph in enumerate(graphs):
+            cls.validate_graph(graph, graph_location(index, graph))
+
+        graph_ids = {graph.get("id") for graph in graphs}
+        return (cls.find_duplicate_ids(graphs) + cls.find_reference_problems(graphs) +
+                cls.validate_hierarchy(data.get("graphHierarchy"), graph_ids))
+
+class StreamingSceneValidator:
+    """json object_hook that validates each graph as soon as it has been parsed"""
+
+    def __init__(self):
+        self.graph_count = 0
+        self.graph_ids = set()
+        self.warnings: List[str] = []  # Duplicate graph IDs and references to missing nodes or graphs
+
+    def __call__(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        # Graph objects are the only objects carrying nodes together with connection lists
+        if "nodes" in obj and ("dataConnections" in obj or "flowConnections" in obj):
+            location = graph_location(self.graph_count, obj)
+            problem = _check_graph(obj, location)
+            if problem:
+                raise SceneValidationError(*problem)
+            self.warnings.extend(_check_graph_references(obj, location))
+
+            graph_id = obj.get("id")
+            if graph_id in self.graph_ids:
+                self.warnings.append(_duplicate_id_warning(location, graph_id))
+            self.graph_ids.add(graph_id)
+            self.graph_count += 1
+        return obj
+
+    def finish(self, data: Any) -> None:
+        """Run the checks that need the whole scene once parsing has finished"""
+        SceneValidator.validate_scene_fields(data)
+
+        # Graphs not recognised by shape while parsing are checked now
+        if self.graph_count != len(data["graphs"]):
+            self.warnings = SceneValidator.validate(data)
+            return
+
+        self.warnings.extend(SceneValidator.validate_hierarchy(data.get("graphHierarchy"), self.graph_ids))
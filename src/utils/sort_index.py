@@ -0,0 +1,81 @@
+from bisect import bisect_left, insort
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+# Default tiebreak after the sort column: category, then name
+def default_tiebreak(row: Dict[str, Any]) -> tuple:
+    return (row.get("category", ""), row.get("name", ""))
+
+class SortIndex:
+    """Cached sorted index permutations of rows, one per sort column"""
+
+    def __init__(self, rows: Iterable[Dict[str, Any]], key_funcs: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 tiebreak: Callable[[Dict[str, Any]], tuple] = default_tiebreak):
+        self.key_funcs = key_funcs
+        self.tiebreak = tiebreak
+        self.rows: List[Optional[Dict[str, Any]]] = list(rows)  # Removed rows become None until compact()
+        self.removed_count = 0
+        self.keys: Dict[str, List[Any]] = {}
+        self.orders: Dict[str, List[int]] = {}
+
+        for column, key_func in key_funcs.items():
+            keys = [self._make_key(key_func, row) for row in self.rows]
+            self.keys[column] = keys
+            self.orders[column] = sorted(range(len(self.rows)), key=keys.__getitem__)
+
+    def _make_key(self, key_func, row: Dict[str, Any]) -> tuple:
+        return (key_func(row),) + self.tiebreak(row) if key_func else self.tiebreak(row)
+
+    def __len__(self) -> int:
+        return len(self.orders[next(iter(self.orders))]) if self.orders else 0
+
+    def order(self, column: str, reverse: bool = False) -> List[int]:
+        """Get row indexes sorted by a column"""
+        order = self.orders[column]
+        return order[::-1] if reverse else order
+
+    def add(self, row: Dict[str, Any]) -> int:
+        """Add a row, updating every sort order, and return its index"""
+        index = len(self.rows)
+        self.rows.append(row)
+        for column, key_func in self.key_funcs.items():
+            keys = self.keys[column]
+            keys.append(self._make_key(key_func, row))
+            insort(self.orders[column], index, key=keys.__getitem__)
+        return index
+
+    def remove(self, index: int):
+        """Remove a row from every sort order"""
+        if self.rows[index] is None:
+            return
+
+        for column in self.key_funcs:
+            keys = self.keys[column]
+            order = self.orders[column]
+            position = bisect_left(order, keys[index], key=keys.__getitem__)
+            # Step over rows with an equal key to find this one
+            while order[position] != index:
+                position += 1
+            del order[position]
+        self.rows[index] = None
+        self.removed_count += 1
+
+    @property
+    def is_sparse(self) -> bool:
+        """Check if removed rows make up more than half of the row list"""
+        return self.removed_count * 2 > len(self.rows)
+
+    def compact(self) -> Dict[int, int]:
+        """Drop removed rows and renumber the rest in place, returning the new index of each old one"""
+        new_indexes = {}
+        for index, row in enumerate(self.rows):
+            if row is not None:
+                new_indexes[index] = len(new_indexes)
+
+        for column in self.key_funcs:
+            keys = self.keys[column]
+            self.keys[column] = [keys[index] for index in new_indexes]
+            self.orders[column] = [new_indexes[index] for index in self.orders[column]]
+        # The list object is kept, since callers hold on to it
+        self.rows[:] = [self.rows[index] for index in new_indexes]
+        self.removed_count = 0
+        return new_indexes
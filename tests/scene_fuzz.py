@@ -0,0 +1,458 @@
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+from src.models.blueprint_data import BlueprintData
+from src.models.asset_index import content_hash
+from src.models.category_tree import CategoryTree, is_blueprint_id
+from src.models.copy_plan import REJECT
+from src.models.variable_index import VariableIndex
+
+CATEGORIES = ("Bp", "Camera", "Face", "Util")
+ASSET_TYPES = ("Camera", "Prop", "Character")
+SUBCATEGORIES = ("A", "B", "C")
+OPERATIONS = ("copy", "move", "replace", "rename", "remove")
+OPERATION_WEIGHTS = (30, 15, 15, 20, 20)
+
+# Small per-operation times are mostly noise; ratios are taken against at least this
+MIN_TIMING = 50e-6
+
+class FuzzFailure(AssertionError):
+    """Raised when the scene breaks an invariant or disagrees with the reference model"""
+
+def _random_id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def random_graph(rng: random.Random, name: str, asset_ids: List[str] = ()) -> Dict[str, Any]:
+    """Generate a blueprint with a few connected nodes, sometimes variables and asset references"""
+    node_ids = [_random_id(rng) for _ in range(rng.randint(1, 4))]
+    nodes = {node_id: {"id": node_id, "typeId": _random_id(rng),
+                       "dataInputs": {"Value": {"value": rng.randint(0, 100)}}} for node_id in node_ids}
+    for node in nodes.values():
+        if asset_ids and rng.random() < 0.3:
+            node["dataInputs"]["Asset"] = {"value": rng.choice(asset_ids)}
+    connections = [{"id": _random_id(rng), "sourceNode": rng.choice(node_ids), "sourcePort": "Output",
+                    "destNode": rng.choice(node_ids), "destPort": "Input"}
+                   for _ in range(rng.randint(0, 3))]
+    variables = [{"name": f"var{rng.randint(0, 20)}", "type": "Int"} for _ in range(rng.choice((0, 0, 1, 2)))]
+    return {
+        "id": _random_id(rng),
+        "name": name,
+        "enabled": rng.random() < 0.9,
+        "order": rng.randint(0, 10),
+        "nodes": nodes,
+        "dataConnections": connections,
+        "flowConnections": [],
+        "properties": {"dataInputs": {"Variables": {"value": json.dumps(variables)}}}
+    }
+
+def random_category(rng: random.Random) -> Tuple[str, ...]:
+    depth = rng.choice((0, 1, 1, 2, 3))
+    if depth == 0:
+        return ()
+    return (rng.choice(CATEGORIES),) + tuple(rng.choice(SUBCATEGORIES) for _ in range(depth - 1))
+
+def random_asset(rng: random.Random) -> Dict[str, Any]:
+    """Generate an asset; contents are drawn from a small set so scenes often share identical assets"""
+    return {"id": _random_id(rng), "name": f"Asset {rng.randrange(4)}", "type": rng.choice(ASSET_TYPES),
+            "settings": {"value": rng.randrange(3)}}
+
+def _place(rng: random.Random, groups: Dict[Tuple[str, ...], Dict[str, Any]], key: str):
+    """Add a hierarchy entry at a random category path, creating its groups"""
+    path = random_category(rng)
+    for depth in range(1, len(path) + 1):
+        if path[:depth] not in groups:
+            group = {"collapsed": False, "key": path[depth - 1], "children": []}
+            groups[path[:depth - 1]]["children"].append(group)
+            groups[path[:depth]] = group
+    groups[path]["children"].append({"collapsed": False, "key": key, "children": None})
+
+def random_scene(rng: random.Random, size: int, name: str) -> Dict[str, Any]:
+    """Generate a scene whose blueprint names and asset contents often collide with another random scene"""
+    asset_root = {"collapsed": False, "key": "", "children": []}
+    asset_groups = {(): asset_root}
+    assets = [random_asset(rng) for _ in range(max(size // 10, 1))]
+    for asset in assets:
+        _place(rng, asset_groups, asset["id"])
+    asset_ids = [asset["id"] for asset in assets]
+
+    root = {"collapsed": False, "key": "", "children": []}
+    groups = {(): root}
+    graphs = []
+    for _ in range(size):
+        graph = random_graph(rng, f"BP {rng.randrange(max(size // 2, 1))}", asset_ids)
+        graphs.append(graph)
+        _place(rng, groups, graph["id"])
+
+    return {"name": name, "appVersion": "0.13.1", "graphs": graphs, "graphHierarchy": root,
+            "assets": assets, "assetHierarchy": asset_root}
+
+class ReferenceScene:
+    """Straightforward model of a scene: blueprints as [id, name, category path] in scene order.
+
+    IDs are None for copies whose IDs were regenerated until they are adopted
+    from the scene under test.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        paths = CategoryTree(data["graphHierarchy"]).blueprint_paths()
+        self.blueprints = [[graph["id"], graph["name"], paths.get(graph["id"], ())] for graph in data["graphs"]]
+
+    def find(self, bp_id: str) -> Optional[List[Any]]:
+        for blueprint in self.blueprints:
+            if blueprint[0] == bp_id:
+                return blueprint
+        return None
+
+    def copy_to(self, target: 'ReferenceScene', bp_ids: List[str], replace_existing: bool,
+                keep_original_id: bool, new_names: Dict[str, str] = None) -> Dict[str, bool]:
+        """Copy one blueprint at a time, resolving conflicts against the target as it is then"""
+        results = {}
+        for bp_id in bp_ids:
+            source = self.find(bp_id)
+            if source is None:
+                results[bp_id] = False
+                continue
+            new_id = bp_id if keep_original_id or replace_existing else None
+            name = (new_names or {}).get(bp_id) or source[1]
+
+            if new_id is not None and target.find(bp_id) is not None:
+                if not replace_existing:
+                    results[bp_id] = False
+                    continue
+                target.blueprints = [blueprint for blueprint in target.blueprints if blueprint[0] != bp_id]
+
+            names = {blueprint[1] for blueprint in target.blueprints}
+            if name in names:
+                if not replace_existing and not keep_original_id:
+                    counter = 1
+                    while f"{name} ({counter})" in names:
+                        counter += 1
+                    name = f"{name} ({counter})"
+                elif replace_existing:
+                    target.blueprints = [blueprint for blueprint in target.blueprints if blueprint[1] != name]
+
+            target.blueprints.append([new_id, name, source[2]])
+            results[bp_id] = True
+        return results
+
+    def remove(self, bp_id: str) -> bool:
+        count = len(self.blueprints)
+        self.blueprints = [blueprint for blueprint in self.blueprints if blueprint[0] != bp_id]
+        return len(self.blueprints) != count
+
+    def rename(self, bp_id: str, name: str) -> bool:
+        blueprint = self.find(bp_id)
+        if blueprint is None:
+            return False
+        blueprint[1] = name
+        return True
+
+def _hierarchy_keys(hierarchy: Dict[str, Any]) -> List[str]:
+    keys = []
+    stack = [hierarchy]
+    while stack:
+        node = stack.pop()
+        children = node.get("children")
+        if children:
+            stack.extend(children)
+        elif node.get("key") and is_blueprint_id(node["key"]):
+            keys.append(node["key"])
+    return keys
+
+def _connections(graph: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return graph["dataConnections"] + graph["flowConnections"]
+
+def check_invariants(scene: BlueprintData, label: str):
+    """Check unique IDs, connections, hierarchy keys, assets and the cached variable index of a scene"""
+    graph_ids = [graph["id"] for graph in scene.data["graphs"]]
+    if len(set(graph_ids)) != len(graph_ids):
+        raise FuzzFailure(f"{label}: duplicate graph IDs")
+
+    node_ids = [node_id for graph in scene.data["graphs"] for node_id in graph["nodes"]]
+    if len(set(node_ids)) != len(node_ids):
+        raise FuzzFailure(f"{label}: duplicate node IDs")
+    connection_ids = [connection["id"] for graph in scene.data["graphs"] for connection in _connections(graph)]
+    if len(set(connection_ids)) != len(connection_ids):
+        raise FuzzFailure(f"{label}: duplicate connection IDs")
+    for graph in scene.data["graphs"]:
+        for node_id, node in graph["nodes"].items():
+            if node["id"] != node_id:
+                raise FuzzFailure(f"{label}: node key {node_id} and node ID {node['id']} differ")
+        for connection in _connections(graph):
+            if connection["sourceNode"] not in graph["nodes"] or connection["destNode"] not in graph["nodes"]:
+                raise FuzzFailure(f"{label}: connection {connection['id']} leaves graph {graph['id']}")
+
+    keys = _hierarchy_keys(scene.data["graphHierarchy"])
+    known = set(graph_ids)
+    missing = [key for key in keys if key not in known]
+    if missing:
+        raise FuzzFailure(f"{label}: hierarchy keys without a graph: {missing[:3]}")
+    if len(keys) != len(set(keys)) or set(keys) != known:
+        raise FuzzFailure(f"{label}: graphs are not placed exactly once in the hierarchy")
+
+    asset_ids = [asset["id"] for asset in scene.data["assets"]]
+    if len(set(asset_ids)) != len(asset_ids):
+        raise FuzzFailure(f"{label}: duplicate asset IDs")
+    asset_keys = _hierarchy_keys(scene.data["assetHierarchy"])
+    if len(asset_keys) != len(set(asset_keys)) or set(asset_keys) != set(asset_ids):
+        raise FuzzFailure(f"{label}: assets are not placed exactly once in the asset hierarchy")
+
+    fresh = VariableIndex()
+    fresh.sync(scene.data["graphs"])
+    cached = scene.get_variable_index()
+    if {name: len(owners) for name, owners in fresh.by_name.items()} != \
+            {name: len(owners) for name, owners in cached.by_name.items()}:
+        raise FuzzFailure(f"{label}: cached variable index is out of date")
+
+def check_copies(plan, source: BlueprintData, target: BlueprintData, copy_assets: bool, label: str):
+    """Check the copies a plan added: IDs are regenerated unless kept, and referenced assets were copied"""
+    source_graphs = {graph["id"]: graph for graph in source.data["graphs"]}
+    target_graphs = {graph["id"]: graph for graph in target.data["graphs"]}
+    source_assets = {asset["id"]: asset for asset in source.data["assets"]}
+    target_assets = {asset["id"]: asset for asset in target.data["assets"]}
+    rejected = {asset["id"] for asset in plan.assets if asset["action"] == REJECT}
+
+    for item in plan.accepted:
+        if not plan.live_slots[item["slot"]]:
+            continue  # Replaced by a later copy in the same batch
+        original = source_graphs[item["id"]]
+        copy_graph = target_graphs.get(item["new_id"])
+        if copy_graph is None:
+            raise FuzzFailure(f"{label}: copy of {item['id']} is missing")
+        if len(copy_graph["nodes"]) != len(original["nodes"]) or \
+                len(_connections(copy_graph)) != len(_connections(original)):
+            raise FuzzFailure(f"{label}: copy of {item['id']} has different nodes or connections")
+
+        original_node_ids = set(original["nodes"])
+        original_connection_ids = {connection["id"] for connection in _connections(original)}
+        copy_node_ids = set(copy_graph["nodes"])
+        copy_connection_ids = {connection["id"] for connection in _connections(copy_graph)}
+        if item["new_id"] != item["id"]:
+            if item["new_id"] in source_graphs:
+                raise FuzzFailure(f"{label}: regenerated ID {item['new_id']} is used in the source scene")
+            if copy_node_ids & original_node_ids or copy_connection_ids & original_connection_ids:
+                raise FuzzFailure(f"{label}: copy of {item['id']} kept node or connection IDs of the original")
+        elif copy_node_ids != original_node_ids or copy_connection_ids != original_connection_ids:
+            raise FuzzFailure(f"{label}: copy of {item['id']} with its original ID changed node or connection IDs")
+
+        if not copy_assets:
+            continue
+        for original_node, copy_node in zip(original["nodes"].values(), copy_graph["nodes"].values()):
+            if "Asset" not in original_node["dataInputs"]:
+                continue
+            asset_id = copy_node["dataInputs"]["Asset"]["value"]
+            if asset_id not in target_assets:
+                raise FuzzFailure(f"{label}: copy of {item['id']} references asset {asset_id} missing from the target")
+            source_id = original_node["dataInputs"]["Asset"]["value"]
+            # A rejected asset (ID taken, Keep original ID) leaves the copy using the target's asset
+            if source_id in source_assets and source_id not in rejected and \
+                    content_hash(target_assets[asset_id]) != content_hash(source_assets[source_id]):
+                raise FuzzFailure(f"{label}: copy of {item['id']} references asset {asset_id} with other contents")
+
+def compare_with_reference(scene: BlueprintData, reference: ReferenceScene, label: str):
+    """Compare blueprint order, names and category paths, adopting regenerated IDs"""
+    paths = CategoryTree(scene.data["graphHierarchy"]).blueprint_paths()
+    actual = [[graph["id"], graph["name"], paths.get(graph["id"])] for graph in scene.data["graphs"]]
+    if len(actual) != len(reference.blueprints):
+        raise FuzzFailure(f"{label}: {len(actual)} blueprints, reference has {len(reference.blueprints)}")
+
+    for index, (actual_bp, expected_bp) in enumerate(zip(actual, reference.blueprints)):
+        if expected_bp[0] is None:
+            expected_bp[0] = actual_bp[0]
+        if actual_bp != expected_bp:
+            raise FuzzFailure(f"{label}: blueprint {index} is {actual_bp}, reference has {expected_bp}")
+
+def check_round_trip(scene: BlueprintData, directory: str, label: str):
+    """Save the scene and check that loading it gives back the same data"""
+    scene.file_path = os.path.join(directory, f"{label}.json")
+    scene.save()
+    loaded = BlueprintData(scene.file_path)
+    if loaded.data != scene.data:
+        raise FuzzFailure(f"{label}: save/load round trip changed the scene")
+
+class SceneFuzzer:
+    """Random operation sequences on two scenes, checked after every step"""
+
+    def __init__(self, seed: int, size: int, directory: str, round_trip_every: int = 25):
+        self.rng = random.Random(seed)
+        self.directory = directory
+        self.round_trip_every = round_trip_every
+        self.scenes = {}
+        self.references = {}
+        for label in ("source", "target"):
+            scene = BlueprintData()
+            scene.data = random_scene(self.rng, size, label)
+            self.scenes[label] = scene
+            self.references[label] = ReferenceScene(scene.data)
+        self.timings: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+
+    def _pick_ids(self, label: str, count: int) -> List[str]:
+        graphs = self.scenes[label].data["graphs"]
+        if not graphs:
+            return [_random_id(self.rng)]
+        ids = [self.rng.choice(graphs)["id"] for _ in range(count)]
+        if self.rng.random() < 0.05:
+            ids.append(_random_id(self.rng))  # Unknown ID
+        return ids
+
+    def step(self, number: int):
+        operation = self.rng.choices(OPERATIONS, OPERATION_WEIGHTS)[0]
+        from_label, to_label = self.rng.sample(("source", "target"), 2)
+        scene, reference = self.scenes[from_label], self.references[from_label]
+        label = f"step {number} {operation} {from_label}"
+
+        if operation in ("copy", "move"):
+            bp_ids = self._pick_ids(from_label, self.rng.randint(1, 8))
+            replace_existing = self.rng.random() < 0.3
+            keep_original_id = self.rng.random() < 0.6
+            copy_assets = self.rng.random() < 0.5
+            new_names = None
+            if self.rng.random() < 0.3:
+                new_names = {bp_id: f"BP {self.rng.randrange(len(reference.blueprints) + 1)}"
+                             for bp_id in bp_ids if self.rng.random() < 0.5}
+            label += f" (replace={replace_existing}, keep_id={keep_original_id}, assets={copy_assets}, " \
+                     f"new_names={new_names})"
+            target = self.scenes[to_label]
+
+            start = time.perf_counter()
+            plan = scene.plan_copy_to_scene(bp_ids, target, new_names, replace_existing, keep_original_id,
+                                            copy_assets)
+            results = scene.apply_copy_plan(plan)
+            elapsed = time.perf_counter() - start
+            # Checked before a move removes the originals
+            check_copies(plan, scene, target, copy_assets, label)
+            start = time.perf_counter()
+            if operation == "move":
+                for bp_id, success in results.items():
+                    if success:
+                        scene.remove_blueprint(bp_id)
+            self.timings[operation].append(elapsed + time.perf_counter() - start)
+
+            expected = reference.copy_to(self.references[to_label], bp_ids, replace_existing, keep_original_id,
+                                         new_names)
+            if operation == "move":
+                for bp_id, success in expected.items():
+                    if success:
+                        reference.remove(bp_id)
+            if results != expected:
+                raise FuzzFailure(f"{label}: results {results}, reference has {expected}")
+
+        elif operation == "replace":
+            bp_id = self._pick_ids(from_label, 1)[0]
+            graph = scene.get_blueprint_by_id(bp_id)
+            if graph is None:
+                return
+            new_graph = copy.deepcopy(graph)
+            for node in new_graph["nodes"].values():
+                node["dataInputs"]["Value"]["value"] = self.rng.randint(0, 100)
+            new_graph["properties"]["dataInputs"]["Variables"]["value"] = json.dumps(
+                [{"name": f"var{self.rng.randint(0, 20)}", "type": "Int"}])
+
+            start = time.perf_counter()
+            replaced = scene.replace_blueprint(bp_id, new_graph)
+            self.timings[operation].append(time.perf_counter() - start)
+            if not replaced:
+                raise FuzzFailure(f"{label}: existing blueprint {bp_id} was not replaced")
+
+        elif operation == "rename":
+            bp_id = self._pick_ids(from_label, 1)[0]
+            name = f"BP {self.rng.randrange(len(reference.blueprints) + 1)}"
+            start = time.perf_counter()
+            renamed = scene.rename_blueprint(bp_id, name)
+            self.timings[operation].append(time.perf_counter() - start)
+            if renamed != reference.rename(bp_id, name):
+                raise FuzzFailure(f"{label}: rename returned {renamed}")
+
+        else:
+            bp_id = self._pick_ids(from_label, 1)[0]
+            start = time.perf_counter()
+            removed = scene.remove_blueprint(bp_id)
+            self.timings[operation].append(time.perf_counter() - start)
+            if removed != reference.remove(bp_id):
+                raise FuzzFailure(f"{label}: remove returned {removed}")
+
+        for scene_label in ("source", "target"):
+            check_invariants(self.scenes[scene_label], f"{label}, {scene_label}")
+            compare_with_reference(self.scenes[scene_label], self.references[scene_label], f"{label}, {scene_label}")
+        if self.round_trip_every and number % self.round_trip_every == 0:
+            for scene_label in ("source", "target"):
+                check_round_trip(self.scenes[scene_label], self.directory, scene_label)
+
+    def run(self, steps: int):
+        for number in range(1, steps + 1):
+            self.step(number)
+
+def median_timings(timings: Dict[str, List[float]]) -> Dict[str, float]:
+    return {operation: statistics.median(values) for operation, values in timings.items() if values}
+
+def check_scaling(small: Dict[str, float], large: Dict[str, float], size_ratio: float,
+                  tolerance: float) -> List[str]:
+    """Get the operations whose time grew faster than linearly with the scene size"""
+    regressions = []
+    for operation, large_time in large.items():
+        if operation not in small:
+            continue
+        ratio = large_time / max(small[operation], MIN_TIMING)
+        if ratio > size_ratio * tolerance:
+            regressions.append(f"{operation}: {ratio:.1f}x slower for a {size_ratio:.0f}x larger scene")
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    """Run random operation sequences against the reference model and check how timings scale"""
+    parser = argparse.ArgumentParser(description="Randomized correctness and scaling check of scene operations")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (printed when not given)")
+    parser.add_argument("--steps", type=int, default=300, help="operations per scene size")
+    parser.add_argument("--sizes", default="200,1600", help="comma-separated blueprint counts per scene")
+    parser.add_argument("--round-trip-every", type=int, default=25, help="steps between save/load checks (0 disables)")
+    parser.add_argument("--tolerance", type=float, default=3.0,
+                        help="allowed growth of an operation's median time beyond linear in the scene size")
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"Seed: {seed}")
+
+    # Backups would write history files beside every round-trip save
+    backups_enabled = BlueprintData.backups_enabled
+    BlueprintData.backups_enabled = False
+    medians = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for size in sizes:
+                fuzzer = SceneFuzzer(seed, size, directory, args.round_trip_every)
+                try:
+                    fuzzer.run(args.steps)
+                except FuzzFailure as e:
+                    print(f"FAILED (seed {seed}, size {size}): {e}")
+                    return 1
+                medians[size] = median_timings(fuzzer.timings)
+    finally:
+        BlueprintData.backups_enabled = backups_enabled
+
+    print(f"{'operation':<10}" + "".join(f"{size:>12}" for size in sizes))
+    for operation in OPERATIONS:
+        print(f"{operation:<10}" + "".join(f"{medians[size].get(operation, 0) * 1000:>10.3f}ms"
+                                            for size in sizes))
+
+    regressions = []
+    for small_size, large_size in zip(sizes, sizes[1:]):
+        regressions += check_scaling(medians[small_size], medians[large_size], large_size / small_size,
+                                     args.tolerance)
+    if regressions:
+        print("Timing regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"OK: {args.steps * len(sizes)} operations matched the reference model")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+from src.utils.backup_store import BackupStore
+
+def _scene(save: int):
+    # One blueprint changes per save, as after a rename
+    graphs = [{"id": f"00000000-0000-0000-0000-{index:012d}", "name": f"Blueprint {index}",
+               "nodes": {}, "dataConnections": [], "flowConnections": []} for index in range(20)]
+    graphs[save % len(graphs)]["name"] = f"Renamed {save}"
+    return {"name": "Scene", "appVersion": "0.13.1", "graphs": graphs}
+
+def test_retention_rewrites_the_base_in_batches(tmp_path, monkeypatch):
+    store = BackupStore(str(tmp_path), max_versions=30)
+    base_writes = []
+    write_blob = store._write_blob
+
+    def counting_write_blob(file_name, payload):
+        if file_name.startswith("base-"):
+            base_writes.append(file_name)
+        return write_blob(file_name, payload)
+
+    monkeypatch.setattr(store, "_write_blob", counting_write_blob)
+
+    saves = 100
+    for save in range(saves):
+        store.record(_scene(save))
+
+    # One initial base, then one fold per 15 versions past the limit instead of one per save
+    assert len(base_writes) <= 1 + saves // (store.max_versions // 2)
+    versions = store.list_versions()
+    assert store.max_versions <= len(versions) < store.max_versions + store.max_versions // 2
+    assert versions[0]["type"] == "base"
+    assert store.restore(versions[-1]["version"]) == _scene(saves - 1)
+    assert store.restore(versions[0]["version"]) == _scene(saves - len(versions))
+    assert sorted(path.name for path in tmp_path.glob("*.json.gz")) == sorted(entry["file"] for entry in versions)
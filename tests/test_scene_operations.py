@@ -0,0 +1,27 @@
+import pytest
+from src.models.blueprint_data import BlueprintData
+from tests.scene_fuzz import SceneFuzzer, check_scaling, median_timings
+
+# Fixed seeds so failures reproduce; python -m tests.scene_fuzz runs new ones and checks timing
+SEEDS = (1, 2, 3)
+
+@pytest.fixture(autouse=True)
+def no_backups(monkeypatch):
+    # Backups would write history files beside every round-trip save
+    monkeypatch.setattr(BlueprintData, "backups_enabled", False)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_operations_match_reference(seed, tmp_path):
+    fuzzer = SceneFuzzer(seed, 100, str(tmp_path))
+    fuzzer.run(300)
+
+def test_operations_scale_sub_quadratically(tmp_path):
+    sizes = (200, 1600)
+    size_ratio = sizes[1] / sizes[0]
+    medians = []
+    for size in sizes:
+        fuzzer = SceneFuzzer(SEEDS[0], size, str(tmp_path), round_trip_every=0)
+        fuzzer.run(100)
+        medians.append(median_timings(fuzzer.timings))
+    # Linear growth is 8x and quadratic 64x; allowing half of quadratic leaves room for timing noise
+    assert check_scaling(medians[0], medians[1], size_ratio, tolerance=size_ratio / 2) == []